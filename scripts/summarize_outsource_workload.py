@@ -2,19 +2,45 @@ from __future__ import annotations
 
 import argparse
 import json
+import os
 import unicodedata
+from collections.abc import Iterator
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
 from dataclasses import dataclass, field
+from functools import cache
 from pathlib import Path
 
-IMAGE_EXTS = {".png", ".jpg", ".jpeg"}
+import numpy as np
 
+try:
+    import orjson  # type: ignore[import-not-found]
+except ModuleNotFoundError:  # pragma: no cover
+    orjson = None  # type: ignore[assignment]
 
+_UTF8_BOM = b"\xef\xbb\xbf"
+
+IMAGE_EXTS = frozenset({".png", ".jpg", ".jpeg"})
+
+# Number of JSON files whose reads are issued together before parsing starts.
+READ_BATCH_SIZE = 256
+
+
+def _char_width(ch: str) -> int:
+    if unicodedata.combining(ch):
+        return 0
+    return 2 if unicodedata.east_asian_width(ch) in {"W", "F"} else 1
+
+
+# Terminal column width of every BMP codepoint; astral characters fall back to `_char_width`.
+_BMP_WIDTHS = bytes(_char_width(chr(cp)) for cp in range(0x10000))
+
+
+@cache
 def _display_width(text: str) -> int:
     width = 0
     for ch in text:
-        if unicodedata.combining(ch):
-            continue
-        width += 2 if unicodedata.east_asian_width(ch) in {"W", "F"} else 1
+        cp = ord(ch)
+        width += _BMP_WIDTHS[cp] if cp < 0x10000 else _char_width(ch)
     return width
 
 
@@ -26,9 +52,11 @@ def _rjust(text: str, width: int) -> str:
     return " " * max(0, width - _display_width(text)) + text
 
 
+_RETURNED = frozenset({"x", "√", "yes", "y", "1", "true", "是", "已发回"})
+
+
 def _is_returned(value: str) -> bool:
-    v = value.strip().lower()
-    return v in {"x", "√", "yes", "y", "1", "true", "是", "已发回"}
+    return value.strip().lower() in _RETURNED
 
 
 @dataclass(frozen=True, slots=True)
@@ -68,60 +96,147 @@ class PersonStats:
     def returned_package_count(self) -> int:
         return len(self.returned_packages)
 
+    def merge(self, other: PersonStats) -> None:
+        self.claimed_packages.extend(other.claimed_packages)
+        self.returned_packages.extend(other.returned_packages)
+        self.unreturned_packages.extend(other.unreturned_packages)
+        self.claimed_photos += other.claimed_photos
+        self.returned_photos += other.returned_photos
+        self.modified += other.modified
+        self.deleted += other.deleted
+        self.added += other.added
+        self.missing_packages.extend(other.missing_packages)
+        self.missing_json_files += other.missing_json_files
+        self.extra_json_files += other.extra_json_files
+        self.json_parse_failures += other.json_parse_failures
 
-def parse_support_md(path: Path) -> list[PackageAssignment]:
-    lines = path.read_text(encoding="utf-8-sig").splitlines()
 
+def parse_support_md(path: Path) -> list[PackageAssignment]:
     assignments: list[PackageAssignment] = []
-    for raw in lines:
-        line = raw.strip()
-        if not line:
-            continue
-        if "压缩包id" in line.lower() and "领取人" in line:
-            continue
+    with path.open(encoding="utf-8-sig") as f:
+        for raw in f:
+            line = raw.strip()
+            if not line:
+                continue
+            if "压缩包id" in line.lower() and "领取人" in line:
+                continue
+
+            parts = line.split()
+            if len(parts) < 2:
+                continue
+
+            try:
+                package_id = int(parts[0])
+            except ValueError:
+                continue
+
+            if len(parts) == 2:
+                assignee = parts[1]
+                returned = False
+            else:
+                returned = _is_returned(parts[-1])
+                assignee = " ".join(parts[1:-1]).strip()
+            if not assignee:
+                assignee = "（未填写）"
 
-        parts = line.split()
-        if len(parts) < 2:
-            continue
+            assignments.append(
+                PackageAssignment(package_id=package_id, assignee=assignee, returned=returned)
+            )
 
-        try:
-            package_id = int(parts[0])
-        except ValueError:
-            continue
+    return assignments
 
-        if len(parts) == 2:
-            assignee = parts[1]
-            returned = False
-        else:
-            returned = _is_returned(parts[-1])
-            assignee = " ".join(parts[1:-1]).strip()
-        if not assignee:
-            assignee = "（未填写）"
 
-        assignments.append(PackageAssignment(package_id=package_id, assignee=assignee, returned=returned))
+def _scandir_recursive(
+    path: str, *, suffixes: frozenset[str] | None = None
+) -> Iterator[os.DirEntry[str]]:
+    """
+    Yields file entries under `path` (recursively) without an extra `stat()` per entry.
 
-    return assignments
+    When `suffixes` (lowercase, with leading dot) is given, names are filtered before the file-type
+    check so non-matching entries never cost an `is_file()` call. Symlinks are not followed;
+    unreadable/vanished directories are skipped.
+    """
+    try:
+        it = os.scandir(path)
+    except (PermissionError, FileNotFoundError):
+        return
+    with it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False):
+                yield from _scandir_recursive(entry.path, suffixes=suffixes)
+                continue
+            if suffixes is not None:
+                name = entry.name
+                dot = name.rfind(".")
+                if dot < 0 or name[dot:].lower() not in suffixes:
+                    continue
+            # Like the original `rglob` + `is_file()`: symlinked files count, symlinked dirs are
+            # not descended into.
+            if entry.is_file():
+                yield entry
+
+
+def _rel_posix(root: str, entry_path: str) -> str:
+    return entry_path[len(root) + 1 :].replace(os.sep, "/")
 
 
 def count_images(dataset_dir: Path) -> int:
-    if not dataset_dir.exists():
-        return 0
-    return sum(
-        1
-        for p in dataset_dir.rglob("*")
-        if p.is_file() and p.suffix.lower() in IMAGE_EXTS
-    )
+    return sum(1 for _ in _scandir_recursive(str(dataset_dir), suffixes=IMAGE_EXTS))
+
 
+def _read_bytes(path: str) -> bytes | None:
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def _read_batched(paths: list[str], *, batch_size: int = READ_BATCH_SIZE) -> Iterator[bytes | None]:
+    """
+    Yields the contents of `paths` in order (None for unreadable files).
+
+    Reads are issued concurrently in batches, and the next batch is already being read while the
+    caller parses the current one, so disk latency overlaps with JSON parsing.
+    """
+    if not paths:
+        return
+    with ThreadPoolExecutor(max_workers=min(32, batch_size)) as pool:
+
+        def submit(start: int) -> list[Future[bytes | None]]:
+            return [pool.submit(_read_bytes, p) for p in paths[start : start + batch_size]]
+
+        pending = submit(0)
+        for start in range(batch_size, len(paths) + batch_size, batch_size):
+            ahead = submit(start) if start < len(paths) else []
+            for future in pending:
+                yield future.result()
+            pending = ahead
 
-def _load_detection_map(path: Path) -> tuple[dict[int, tuple[float, float, float, float]], bool]:
+
+def _empty_detections() -> tuple[np.ndarray, np.ndarray]:
+    return np.empty(0, dtype=np.int64), np.empty((0, 4), dtype=np.float64)
+
+
+def _load_detection_map(data: bytes | None) -> tuple[np.ndarray, np.ndarray, bool]:
+    """
+    Parses one result JSON into `(ids[int64, N], bboxes[float64, N x 4], ok)`.
+
+    `ok` is False when the file could not be read/parsed. Ids are unique (the last occurrence of a
+    duplicated id wins).
+    """
+    if data is None:
+        return (*_empty_detections(), False)
     try:
-        payload = json.loads(path.read_text(encoding="utf-8-sig"))
+        if data[:3] == _UTF8_BOM:
+            data = data[3:]
+        payload = orjson.loads(data) if orjson is not None else json.loads(data)
     except Exception:
-        return {}, False
+        return (*_empty_detections(), False)
 
     dets = payload.get("detections", [])
     if not isinstance(dets, list):
-        return {}, True
+        return (*_empty_detections(), True)
 
     mapping: dict[int, tuple[float, float, float, float]] = {}
     for det in dets:
@@ -135,16 +250,11 @@ def _load_detection_map(path: Path) -> tuple[dict[int, tuple[float, float, float
             continue
         mapping[det_id] = (float(bbox[0]), float(bbox[1]), float(bbox[2]), float(bbox[3]))
 
-    return mapping, True
-
-
-def _bbox_changed(
-    a: tuple[float, float, float, float],
-    b: tuple[float, float, float, float],
-    *,
-    tol: float,
-) -> bool:
-    return any(abs(x - y) > tol for x, y in zip(a, b, strict=True))
+    if not mapping:
+        return (*_empty_detections(), True)
+    ids = np.fromiter(mapping, dtype=np.int64, count=len(mapping))
+    bboxes = np.asarray(list(mapping.values()), dtype=np.float64)
+    return ids, bboxes, True
 
 
 def summarize_package(
@@ -153,50 +263,65 @@ def summarize_package(
     seg_pkg_dir: Path,
     result_pkg_dir: Path,
     tol: float,
-    stats: PersonStats,
-) -> None:
+) -> PersonStats:
+    """
+    Compares one package's original vs. returned JSON files.
+
+    Returns a fresh `PersonStats` holding only this package's counters so it can be computed in a
+    worker process and merged into the assignee's totals afterwards.
+    """
+    stats = PersonStats()
     orig_output_dir = seg_pkg_dir / "output"
     res_output_dir = result_pkg_dir / "output"
 
     if not orig_output_dir.exists() or not res_output_dir.exists():
         stats.missing_packages.append(package_id)
-        return
-
-    orig_rel_paths: set[str] = set()
-    res_rel_paths: set[str] = set()
-
-    for p in res_output_dir.rglob("*.json"):
-        if p.is_file():
-            res_rel_paths.add(p.relative_to(res_output_dir).as_posix())
-
-    for orig_json in orig_output_dir.rglob("*.json"):
-        if not orig_json.is_file():
+        return stats
+
+    orig_root = str(orig_output_dir)
+    res_root = str(res_output_dir)
+
+    # rel path -> absolute path; entries left over after matching are the "extra" result files.
+    res_by_rel: dict[str, str] = {
+        _rel_posix(res_root, entry.path): entry.path
+        for entry in _scandir_recursive(res_root)
+        if entry.name.endswith(".json")
+    }
+
+    # Interleaved [orig, res, orig, res, ...] so both sides of a pair arrive together.
+    pair_paths: list[str] = []
+    for entry in _scandir_recursive(orig_root):
+        if not entry.name.endswith(".json"):
             continue
-        rel = orig_json.relative_to(orig_output_dir).as_posix()
-        orig_rel_paths.add(rel)
-
-        res_json = res_output_dir / rel
-        if not res_json.exists():
+        res_path = res_by_rel.pop(_rel_posix(orig_root, entry.path), None)
+        if res_path is None:
             stats.missing_json_files += 1
             continue
 
-        orig_map, ok1 = _load_detection_map(orig_json)
-        res_map, ok2 = _load_detection_map(res_json)
+        pair_paths.append(entry.path)
+        pair_paths.append(res_path)
+
+    stats.extra_json_files += len(res_by_rel)
+
+    contents = _read_batched(pair_paths)
+    for orig_data, res_data in zip(contents, contents, strict=False):
+        orig_ids, orig_boxes, ok1 = _load_detection_map(orig_data)
+        res_ids, res_boxes, ok2 = _load_detection_map(res_data)
         if not (ok1 and ok2):
             stats.json_parse_failures += 1
             continue
 
-        orig_ids = set(orig_map)
-        res_ids = set(res_map)
-
-        stats.deleted += len(orig_ids - res_ids)
-        stats.added += len(res_ids - orig_ids)
+        common, orig_idx, res_idx = np.intersect1d(
+            orig_ids, res_ids, assume_unique=True, return_indices=True
+        )
+        stats.deleted += len(orig_ids) - len(common)
+        stats.added += len(res_ids) - len(common)
 
-        for det_id in orig_ids & res_ids:
-            if _bbox_changed(orig_map[det_id], res_map[det_id], tol=tol):
-                stats.modified += 1
+        if len(common):
+            diff = np.abs(orig_boxes[orig_idx] - res_boxes[res_idx])
+            stats.modified += int(np.any(diff > tol, axis=1).sum())
 
-    stats.extra_json_files += len(res_rel_paths - orig_rel_paths)
+    return stats
 
 
 def _render_table(rows: list[list[str]]) -> str:
@@ -258,6 +383,7 @@ def main() -> None:
         raise ValueError(f"No valid assignments found in: {support_md}")
 
     stats_by_person: dict[str, PersonStats] = {}
+    package_jobs: list[tuple[str, dict[str, object]]] = []
     for a in assignments:
         person_stats = stats_by_person.setdefault(a.assignee, PersonStats())
         seg_pkg = seg_root / f"data-{a.package_id}"
@@ -278,14 +404,28 @@ def main() -> None:
 
         person_stats.returned_packages.append(a.package_id)
         person_stats.returned_photos += photo_count
-        summarize_package(
-            package_id=a.package_id,
-            seg_pkg_dir=seg_pkg,
-            result_pkg_dir=res_pkg,
-            tol=float(args.tol),
-            stats=person_stats,
+        package_jobs.append(
+            (
+                a.assignee,
+                {
+                    "package_id": a.package_id,
+                    "seg_pkg_dir": seg_pkg,
+                    "result_pkg_dir": res_pkg,
+                    "tol": float(args.tol),
+                },
+            )
         )
 
+    # Packages are independent tree-walk + JSON-parse workloads: scan them in parallel.
+    if len(package_jobs) > 1:
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as pool:
+            futures = [(name, pool.submit(summarize_package, **kw)) for name, kw in package_jobs]
+            for name, future in futures:
+                stats_by_person[name].merge(future.result())
+    else:
+        for name, kw in package_jobs:
+            stats_by_person[name].merge(summarize_package(**kw))
+
     def sort_key(item: tuple[str, PersonStats]) -> tuple[int, int, int, str]:
         _name, st = item
         return (st.operated, st.returned_photos, st.returned_package_count, _name)
@@ -310,19 +450,7 @@ def main() -> None:
                 str(st.operated),
             ]
         )
-
-        total.claimed_packages.extend(st.claimed_packages)
-        total.returned_packages.extend(st.returned_packages)
-        total.unreturned_packages.extend(st.unreturned_packages)
-        total.claimed_photos += st.claimed_photos
-        total.returned_photos += st.returned_photos
-        total.modified += st.modified
-        total.deleted += st.deleted
-        total.added += st.added
-        total.missing_packages.extend(st.missing_packages)
-        total.missing_json_files += st.missing_json_files
-        total.extra_json_files += st.extra_json_files
-        total.json_parse_failures += st.json_parse_failures
+        total.merge(st)
 
     rows.append(
         [
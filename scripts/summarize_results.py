@@ -2,8 +2,38 @@ from __future__ import annotations
 
 import argparse
 import json
+import mmap
+import os
+from array import array
 from collections import Counter
 from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+try:
+    import orjson  # type: ignore[import-not-found]
+except ModuleNotFoundError:  # pragma: no cover
+    orjson = None  # type: ignore[assignment]
+
+_UTF8_BOM = b"\xef\xbb\xbf"
+
+
+def _load_json(path: Path) -> Any:  # noqa: ANN401
+    """
+    Parses a JSON file. With orjson, straight from a read-only memory map (no intermediate
+    `bytes` copy); otherwise a plain text read, which the stdlib parser needs anyway.
+    """
+    if orjson is None:
+        return json.loads(path.read_text(encoding="utf-8"))
+    with path.open("rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            # Empty files cannot be mapped; let the parser report the error as before.
+            return orjson.loads(b"")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+            start = 3 if view[:3] == _UTF8_BOM else 0
+            with view[start:] as body:
+                return orjson.loads(body)
 
 
 def main() -> None:
@@ -21,7 +51,8 @@ def main() -> None:
     try:
         import tomllib
 
-        cfg = tomllib.loads(config_path.read_text(encoding="utf-8"))
+        with config_path.open("rb") as f:
+            cfg = tomllib.load(f)
         output_dir = Path(cfg.get("output", {}).get("dir", "output"))
     except Exception:
         output_dir = Path("output")
@@ -34,9 +65,9 @@ def main() -> None:
         return
 
     counts: list[int] = []
-    areas: list[float] = []
+    areas = array("d")
     for p in json_files:
-        payload = json.loads(p.read_text(encoding="utf-8"))
+        payload = _load_json(p)
         dets = payload.get("detections", [])
         counts.append(len(dets))
         w = float(payload.get("image", {}).get("width", 0))
@@ -50,22 +81,23 @@ def main() -> None:
             area = max((xmax - xmin), 0.0) * max((ymax - ymin), 0.0)
             areas.append(area / img_area)
 
-    counts_sorted = sorted(counts)
-    total = len(counts)
+    counts_arr = np.asarray(counts, dtype=np.int64)
+    total = len(counts_arr)
+    # Same order statistics as indexing a fully sorted list, in O(n) via partial partitioning.
+    median_count = np.partition(counts_arr, total // 2)[total // 2]
     print(f"Images: {total}")
-    print(f"Total detections: {sum(counts)}")
-    print(f"Detections/img: min={counts_sorted[0]} median={counts_sorted[total//2]} max={counts_sorted[-1]}")
+    print(f"Total detections: {int(counts_arr.sum())}")
+    print(f"Detections/img: min={counts_arr.min()} median={median_count} max={counts_arr.max()}")
 
     c = Counter(counts)
     common = ", ".join(f"{k}:{v}" for k, v in c.most_common(10))
     print(f"Top counts: {common}")
 
     if areas:
-        areas_sorted = sorted(areas)
-        n = len(areas_sorted)
-        p50 = areas_sorted[n // 2]
-        p90 = areas_sorted[int(n * 0.9)]
-        p99 = areas_sorted[int(n * 0.99)]
+        areas_arr = np.frombuffer(areas, dtype=np.float64)
+        n = len(areas_arr)
+        ks = [n // 2, int(n * 0.9), int(n * 0.99)]
+        p50, p90, p99 = np.partition(areas_arr, ks)[ks]
         print(f"BBox area/image area: p50={p50:.6f} p90={p90:.6f} p99={p99:.6f}")
 
 
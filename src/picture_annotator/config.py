@@ -1,11 +1,17 @@
 from __future__ import annotations
 
+import os
+import pickle
+from collections.abc import Callable
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
 
 DEFAULT_INPUT_EXTENSIONS: tuple[str, ...] = (".png", ".jpg", ".jpeg")
 DEFAULT_VIS_BOX_COLOR: tuple[int, int, int] = (0, 255, 0)
+MODEL_EXPORT_FORMATS: tuple[str, ...] = ("", "onnx", "engine")
+VIS_FORMATS: tuple[str, ...] = ("jpg", "png")
+OUTPUT_MODES: tuple[str, ...] = ("json", "ndjson")
 
 
 @dataclass(frozen=True, slots=True)
@@ -20,6 +26,7 @@ class OutputConfig:
     dir: Path
     overwrite: bool = True
     write_empty: bool = True
+    mode: str = "json"
 
 
 @dataclass(frozen=True, slots=True)
@@ -29,6 +36,8 @@ class VisualizationConfig:
     box_color: tuple[int, int, int] = DEFAULT_VIS_BOX_COLOR
     line_width: int = 2
     write_label: bool = True
+    format: str = "jpg"
+    jpeg_quality: int = 85
 
 
 @dataclass(frozen=True, slots=True)
@@ -39,6 +48,10 @@ class ModelConfig:
     iou_threshold: float = 0.5
     imgsz: int = 1280
     max_det: int = 300
+    batch: int = 1
+    half: bool = True
+    export_format: str = ""
+    torch_threads: int = 0  # 0: PyTorch default (one thread per core)
 
 
 @dataclass(frozen=True, slots=True)
@@ -51,6 +64,7 @@ class SahiConfig:
     postprocess_type: str = "NMS"
     postprocess_match_metric: str = "IOU"
     postprocess_match_threshold: float = 0.5
+    batch: int = 1
 
 
 @dataclass(frozen=True, slots=True)
@@ -127,11 +141,96 @@ def _get_rgb(table: dict[str, Any], key: str, default: tuple[int, int, int]) ->
     return (value[0], value[1], value[2])
 
 
+def _get_path(table: dict[str, Any], key: str, default: str, section: str) -> Path:
+    return _require_path(table.get(key, default), f"{section}.{key}")
+
+
+# Per-section (key, kind, default) schemas, resolved once at import time.
+_SchemaEntry = tuple[str, str, Any]
+
+_INPUT_SCHEMA: tuple[_SchemaEntry, ...] = (
+    ("dir", "path", "data/dataset"),
+    ("recursive", "bool", False),
+    ("extensions", "str_list", DEFAULT_INPUT_EXTENSIONS),
+)
+
+_OUTPUT_SCHEMA: tuple[_SchemaEntry, ...] = (
+    ("dir", "path", "data/output"),
+    ("overwrite", "bool", True),
+    ("write_empty", "bool", True),
+    ("mode", "str", "json"),
+)
+
+_VISUALIZATION_SCHEMA: tuple[_SchemaEntry, ...] = (
+    ("enabled", "bool", True),
+    ("dir", "path", "data/visual_output"),
+    ("box_color", "rgb", DEFAULT_VIS_BOX_COLOR),
+    ("line_width", "int", 2),
+    ("write_label", "bool", True),
+    ("format", "str", "jpg"),
+    ("jpeg_quality", "int", 85),
+)
+
+_MODEL_SCHEMA: tuple[_SchemaEntry, ...] = (
+    ("weights", "str", "data/weights/yolov8x.pt"),
+    ("device", "str", "cpu"),
+    ("confidence_threshold", "float", 0.1),
+    ("iou_threshold", "float", 0.5),
+    ("imgsz", "int", 1280),
+    ("max_det", "int", 300),
+    ("batch", "int", 1),
+    ("half", "bool", True),
+    ("export_format", "str", ""),
+    ("torch_threads", "int", 0),
+)
+
+_SAHI_SCHEMA: tuple[_SchemaEntry, ...] = (
+    ("enabled", "bool", True),
+    ("slice_height", "int", 640),
+    ("slice_width", "int", 640),
+    ("overlap_height_ratio", "float", 0.2),
+    ("overlap_width_ratio", "float", 0.2),
+    ("postprocess_type", "str", "NMS"),
+    ("postprocess_match_metric", "str", "IOU"),
+    ("postprocess_match_threshold", "float", 0.5),
+    ("batch", "int", 1),
+)
+
+_GETTERS: dict[str, Callable[[dict[str, Any], str, Any], Any]] = {
+    "bool": _get_bool,
+    "int": _get_int,
+    "float": _get_float,
+    "str": _get_str,
+    "str_list": _get_str_list,
+    "rgb": _get_rgb,
+}
+
+
+def _apply_schema(
+    table: dict[str, Any], section: str, schema: tuple[_SchemaEntry, ...]
+) -> dict[str, Any]:
+    values: dict[str, Any] = {}
+    for key, kind, default in schema:
+        if kind == "path":
+            values[key] = _get_path(table, key, default, section)
+        else:
+            values[key] = _GETTERS[kind](table, key, default)
+    return values
+
+
 def _validate(config: AppConfig) -> None:
     if config.model.imgsz <= 0:
         raise ValueError("config: model.imgsz must be > 0")
     if config.model.max_det <= 0:
         raise ValueError("config: model.max_det must be > 0")
+    if config.model.batch <= 0:
+        raise ValueError("config: model.batch must be > 0")
+    if config.output.mode not in OUTPUT_MODES:
+        raise ValueError('config: output.mode must be "json" or "ndjson"')
+    if config.model.torch_threads < 0:
+        raise ValueError("config: model.torch_threads must be >= 0")
+    if config.model.export_format not in MODEL_EXPORT_FORMATS:
+        raise ValueError('config: model.export_format must be "", "onnx" or "engine"')
     if not (0.0 <= config.model.confidence_threshold <= 1.0):
         raise ValueError("config: model.confidence_threshold must be in [0,1]")
     if not (0.0 <= config.model.iou_threshold <= 1.0):
@@ -142,17 +241,74 @@ def _validate(config: AppConfig) -> None:
         raise ValueError("config: sahi.overlap_height_ratio must be in [0,1)")
     if not (0.0 <= config.sahi.overlap_width_ratio < 1.0):
         raise ValueError("config: sahi.overlap_width_ratio must be in [0,1)")
+    if config.sahi.batch <= 0:
+        raise ValueError("config: sahi.batch must be > 0")
     if config.visualization.line_width <= 0:
         raise ValueError("config: visualization.line_width must be > 0")
+    if config.visualization.format not in VIS_FORMATS:
+        raise ValueError('config: visualization.format must be "jpg" or "png"')
+    if not (1 <= config.visualization.jpeg_quality <= 95):
+        raise ValueError("config: visualization.jpeg_quality must be in [1,95]")
+
+
+def _cache_path(path: Path) -> Path:
+    return path.with_name(path.name + ".pickle")
+
+
+def _cache_key(path: Path) -> tuple[int, int, int] | None:
+    """
+    (config mtime_ns, config size, this module's mtime_ns): editing either the TOML or the
+    parsing code invalidates the cached `AppConfig`. None (no caching) when either cannot be
+    stat'ed, e.g. in a frozen build where this module is not a file on disk.
+    """
+    try:
+        st = path.stat()
+        module_mtime_ns = Path(__file__).stat().st_mtime_ns
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size, module_mtime_ns)
+
+
+def _read_cached_config(path: Path, key: tuple[int, int, int]) -> AppConfig | None:
+    try:
+        cached_key, config = pickle.loads(_cache_path(path).read_bytes())
+    except Exception:
+        return None
+    if cached_key != key or not isinstance(config, AppConfig):
+        return None
+    return config
+
+
+def _write_cached_config(path: Path, key: tuple[int, int, int], config: AppConfig) -> None:
+    """
+    Best-effort: a read-only config dir or any write error just means no cache.
+    """
+    cache = _cache_path(path)
+    tmp = cache.with_name(f"{cache.name}.{os.getpid()}.tmp")
+    try:
+        tmp.write_bytes(pickle.dumps((key, config), protocol=pickle.HIGHEST_PROTOCOL))
+        os.replace(tmp, cache)
+    except Exception:
+        try:
+            tmp.unlink(missing_ok=True)
+        except OSError:
+            pass
 
 
 def load_config(path: Path) -> AppConfig:
     if not path.exists():
         raise FileNotFoundError(f"config not found: {path}")
 
+    # The cache is only an accelerator: any problem with it falls back to parsing the TOML.
+    key = _cache_key(path)
+    cached = _read_cached_config(path, key) if key is not None else None
+    if cached is not None:
+        return cached
+
     import tomllib
 
-    data = tomllib.loads(path.read_text(encoding="utf-8"))
+    with path.open("rb") as f:
+        data = tomllib.load(f)
 
     input_table = _as_dict_table(data.get("input"), "input")
     output_table = _as_dict_table(data.get("output"), "output")
@@ -161,52 +317,16 @@ def load_config(path: Path) -> AppConfig:
     sahi_table = _as_dict_table(data.get("sahi"), "sahi")
 
     config = AppConfig(
-        input=InputConfig(
-            dir=_require_path(input_table.get("dir", "data/dataset"), "input.dir"),
-            recursive=_get_bool(input_table, "recursive", False),
-            extensions=_get_str_list(input_table, "extensions", DEFAULT_INPUT_EXTENSIONS),
-        ),
-        output=OutputConfig(
-            dir=_require_path(output_table.get("dir", "data/output"), "output.dir"),
-            overwrite=_get_bool(output_table, "overwrite", True),
-            write_empty=_get_bool(output_table, "write_empty", True),
-        ),
+        input=InputConfig(**_apply_schema(input_table, "input", _INPUT_SCHEMA)),
+        output=OutputConfig(**_apply_schema(output_table, "output", _OUTPUT_SCHEMA)),
         visualization=VisualizationConfig(
-            enabled=_get_bool(vis_table, "enabled", True),
-            dir=_require_path(vis_table.get("dir", "data/visual_output"), "visualization.dir"),
-            box_color=_get_rgb(vis_table, "box_color", DEFAULT_VIS_BOX_COLOR),
-            line_width=_get_int(vis_table, "line_width", 2),
-            write_label=_get_bool(vis_table, "write_label", True),
-        ),
-        model=ModelConfig(
-            weights=_get_str(model_table, "weights", "data/weights/yolov8x.pt"),
-            device=_get_str(model_table, "device", "cpu"),
-            confidence_threshold=_get_float(
-                model_table, "confidence_threshold", 0.1
-            ),
-            iou_threshold=_get_float(model_table, "iou_threshold", 0.5),
-            imgsz=_get_int(model_table, "imgsz", 1280),
-            max_det=_get_int(model_table, "max_det", 300),
-        ),
-        sahi=SahiConfig(
-            enabled=_get_bool(sahi_table, "enabled", True),
-            slice_height=_get_int(sahi_table, "slice_height", 640),
-            slice_width=_get_int(sahi_table, "slice_width", 640),
-            overlap_height_ratio=_get_float(
-                sahi_table, "overlap_height_ratio", 0.2
-            ),
-            overlap_width_ratio=_get_float(
-                sahi_table, "overlap_width_ratio", 0.2
-            ),
-            postprocess_type=_get_str(sahi_table, "postprocess_type", "NMS"),
-            postprocess_match_metric=_get_str(
-                sahi_table, "postprocess_match_metric", "IOU"
-            ),
-            postprocess_match_threshold=_get_float(
-                sahi_table, "postprocess_match_threshold", 0.5
-            ),
+            **_apply_schema(vis_table, "visualization", _VISUALIZATION_SCHEMA)
         ),
+        model=ModelConfig(**_apply_schema(model_table, "model", _MODEL_SCHEMA)),
+        sahi=SahiConfig(**_apply_schema(sahi_table, "sahi", _SAHI_SCHEMA)),
     )
 
     _validate(config)
+    if key is not None:
+        _write_cached_config(path, key, config)
     return config
@@ -1,8 +1,12 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Protocol
+from typing import TYPE_CHECKING, Protocol
+
+if TYPE_CHECKING:
+    import numpy as np
 
 
 @dataclass(frozen=True, slots=True)
@@ -12,7 +16,22 @@ class Detection:
     score: float
 
 
+@dataclass(frozen=True, slots=True)
+class ImageDetections:
+    detections: list[Detection]
+    width: int  # size of the image the detector decoded (pixels)
+    height: int
+    # The decoded HxWx3 BGR frame the boxes refer to, when the detector keeps it for reuse.
+    image: np.ndarray | None = field(default=None, repr=False, compare=False)
+
+
 class PersonDetector(Protocol):
-    def detect(self, image_path: Path) -> list[Detection]:
+    def detect(self, image_path: Path) -> ImageDetections:
+        ...
+
+    def detect_batch(self, image_paths: list[Path]) -> list[ImageDetections]:
+        ...
+
+    def detect_stream(self, image_paths: Iterable[Path]) -> Iterator[ImageDetections]:
         ...
 
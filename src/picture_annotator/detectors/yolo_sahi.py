@@ -1,46 +1,174 @@
 from __future__ import annotations
 
+import contextlib
 import logging
+import os
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
+from itertools import islice
 from pathlib import Path
 from typing import Any
 
+import numpy as np
+
 from picture_annotator.config import AppConfig
-from picture_annotator.detectors.base import Detection
+from picture_annotator.detectors.base import Detection, ImageDetections
 
 LOGGER = logging.getLogger(__name__)
 
+# COCO class id of "person".
+PERSON_CLASS_ID = 0
+
 
 @dataclass(slots=True)
 class _SahiRuntime:
     detection_model: Any
     get_sliced_prediction: Any
+    # Pieces of SAHI used when tiles are batched (`sahi.batch > 1`).
+    slice_image: Any = None
+    read_image_as_pil: Any = None
+    object_prediction: Any = None
+    postprocess: Any = None
 
 
 class YoloSahiPersonDetector:
     def __init__(self, *, config: AppConfig, project_root: Path) -> None:
         self._config = config
         self._project_root = project_root
+        _configure_kernel_caches(project_root)
+        _configure_torch_threads(config.model.torch_threads)
         self._sahi: _SahiRuntime | None = None
         self._ultralytics_model: Any | None = None
+        self._half: bool | None = None
+        self._weights_arg: str | None = None
+        # Decoded frames are handed on with the results only if visualization will draw on them.
+        self._keep_images = config.visualization.enabled
+
+    def detect(self, image_path: Path) -> ImageDetections:
+        return self.detect_batch([image_path])[0]
+
+    def detect_batch(self, image_paths: list[Path]) -> list[ImageDetections]:
+        """
+        Detects persons in several images; returns one result per input path (same order), with the
+        image size taken from the decoded image.
+
+        Without SAHI, images are sent to Ultralytics `predict` in chunks of `model.batch`. With
+        SAHI, images are processed one at a time and their tiles are batched by `sahi.batch`.
+        """
+        if not image_paths:
+            return []
+        if self._config.sahi.enabled:
+            return [self._detect_with_sahi(p) for p in image_paths]
+        return self._detect_full_images(image_paths)
+
+    def detect_stream(self, image_paths: Iterable[Path]) -> Iterator[ImageDetections]:
+        """
+        Lazily detects persons in `image_paths`; yields one result per path (same order).
 
-    def detect(self, image_path: Path) -> list[Detection]:
+        Without SAHI, the next chunk of `model.batch` images is read and decoded on a background
+        thread while the current chunk runs on the model, so disk/decode overlaps inference.
+        """
         if self._config.sahi.enabled:
-            return self._detect_with_sahi(image_path)
-        return self._detect_full_image(image_path)
+            for image_path in image_paths:
+                yield self._detect_with_sahi(image_path)
+            return
+
+        model = self._ensure_ultralytics_model()
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="decode") as pool:
+            pending: tuple[list[Path], Future[list[np.ndarray]]] | None = None
+            for chunk in _chunked(image_paths, self._config.model.batch):
+                decoded = pool.submit(_read_images, chunk)
+                if pending is not None:
+                    yield from self._predict(model, pending[1].result(), len(pending[0]))
+                pending = (chunk, decoded)
+            if pending is not None:
+                yield from self._predict(model, pending[1].result(), len(pending[0]))
+
+    def _use_half(self) -> bool:
+        """
+        Whether to run FP16 inference: `model.half` is set and the device has fast FP16 math.
+        """
+        if self._half is None:
+            self._half = self._config.model.half and _device_supports_half(
+                self._config.model.device
+            )
+            if self._half:
+                LOGGER.info("FP16 inference enabled on device=%s", self._config.model.device)
+        return self._half
 
     def _resolve_weights_arg(self) -> str:
+        """
+        Resolves `model.weights` once (path normalization, mkdir, download check) and caches it.
+        """
+        if self._weights_arg is not None:
+            return self._weights_arg
+
         weights = self._config.model.weights.strip()
         if not weights:
             raise ValueError("config: model.weights must be a non-empty string")
 
         # URL weights are passed through as-is.
         if "://" in weights:
+            self._weights_arg = weights
             return weights
 
         weights_path = self._resolve_weights_path(weights)
         weights_path = self._ensure_weights_available(weights_path)
-        return str(weights_path)
+        self._weights_arg = str(weights_path)
+        return self._weights_arg
+
+    def _resolve_inference_weights(self, *, for_sahi: bool) -> str:
+        """
+        Returns the weights to load for inference: the `.pt` file, or its one-time export to
+        `model.export_format` (ONNX / TensorRT engine) when configured.
+        """
+        weights = self._resolve_weights_arg()
+        fmt = self._config.model.export_format
+        if not fmt or not weights.endswith(".pt"):
+            return weights
+        if fmt == "engine" and for_sahi:
+            LOGGER.warning(
+                "model.export_format=engine is not supported by SAHI; using PyTorch weights %s",
+                weights,
+            )
+            return weights
+        # SAHI runs one tile per predict() call.
+        batch = 1 if for_sahi else self._config.model.batch
+        return str(self._ensure_exported(Path(weights), fmt=fmt, batch=batch))
+
+    def _ensure_exported(self, pt_path: Path, *, fmt: str, batch: int) -> Path:
+        """
+        Exports `pt_path` once; the artifact is cached next to it, keyed by batch/imgsz/precision
+        (e.g. `yolov8x_b1_1280_fp16.engine`).
+        """
+        imgsz = self._config.model.imgsz
+        half = self._use_half()
+        target = pt_path.with_name(
+            f"{pt_path.stem}_b{batch}_{imgsz}_{'fp16' if half else 'fp32'}.{fmt}"
+        )
+        if target.exists():
+            return target
+
+        try:
+            from ultralytics import YOLO  # type: ignore[import-not-found]
+        except ModuleNotFoundError as e:  # pragma: no cover
+            raise RuntimeError(
+                "Missing dependency: ultralytics. Install with `uv sync` (see README)."
+            ) from e
+
+        LOGGER.info("Exporting %s to %s (one-time)", pt_path.name, target.name)
+        exported = YOLO(str(pt_path)).export(
+            format=fmt,
+            imgsz=imgsz,
+            half=half,
+            batch=batch,
+            # The last chunk of a run can be smaller than `batch`.
+            dynamic=batch > 1,
+            device=self._config.model.device,
+        )
+        Path(exported).replace(target)
+        return target
 
     def _resolve_weights_path(self, weights: str) -> Path:
         """
@@ -58,8 +186,6 @@ class YoloSahiPersonDetector:
             resolved = (self._project_root / weights_path).resolve()
         else:
             resolved = (self._project_root / "data" / "weights" / weights_path).resolve()
-
-        resolved.parent.mkdir(parents=True, exist_ok=True)
         return resolved
 
     def _ensure_weights_available(self, weights_path: Path) -> Path:
@@ -77,6 +203,8 @@ class YoloSahiPersonDetector:
             attempt_download_asset = None  # type: ignore[assignment]
 
         if attempt_download_asset is not None:
+            # Only a download needs the directory; existing weights are used without touching it.
+            weights_path.parent.mkdir(parents=True, exist_ok=True)
             attempt_download_asset(weights_path)
 
         if not weights_path.exists():
@@ -93,13 +221,19 @@ class YoloSahiPersonDetector:
 
         try:
             from sahi import AutoDetectionModel  # type: ignore[import-not-found]
-            from sahi.predict import get_sliced_prediction  # type: ignore[import-not-found]
+            from sahi.predict import (  # type: ignore[import-not-found]
+                POSTPROCESS_NAME_TO_CLASS,
+                get_sliced_prediction,
+            )
+            from sahi.prediction import ObjectPrediction  # type: ignore[import-not-found]
+            from sahi.slicing import slice_image  # type: ignore[import-not-found]
+            from sahi.utils.cv import read_image_as_pil  # type: ignore[import-not-found]
         except ModuleNotFoundError as e:  # pragma: no cover
             raise RuntimeError(
                 "Missing dependency: sahi. Install with `uv sync` (see README)."
             ) from e
 
-        weights = self._resolve_weights_arg()
+        weights = self._resolve_inference_weights(for_sahi=True)
 
         last_error: Exception | None = None
         for model_type in ("yolov8", "ultralytics"):
@@ -112,79 +246,153 @@ class YoloSahiPersonDetector:
                     image_size=self._config.model.imgsz,
                 )
                 LOGGER.info("SAHI model_type=%s weights=%s", model_type, weights)
+                # SAHI has no half-precision option; Ultralytics merges `overrides` into every
+                # predict() call SAHI makes on tiles.
+                overrides = getattr(getattr(detection_model, "model", None), "overrides", None)
+                if self._use_half() and isinstance(overrides, dict):
+                    overrides["half"] = True
                 self._sahi = _SahiRuntime(
                     detection_model=detection_model,
                     get_sliced_prediction=get_sliced_prediction,
                 )
-                return self._sahi
+                break
             except Exception as e:  # pragma: no cover
                 last_error = e
+        else:
+            raise RuntimeError(
+                "Failed to initialize SAHI AutoDetectionModel "
+                f"(weights={weights}). Last error: {last_error}"
+            )
 
-        raise RuntimeError(
-            "Failed to initialize SAHI AutoDetectionModel "
-            f"(weights={weights}). Last error: {last_error}"
-        )
+        # On GPU, one dummy tile so predictor setup and cuDNN autotuning happen at load time, not
+        # on the first real image. Edge tiles can be smaller, but most tiles have this shape.
+        _enable_cudnn_benchmark(self._config.model.device)
+        sahi_cfg = self._config.sahi
+        warmup = _is_accelerator_device(self._config.model.device)
+        tile = np.zeros((sahi_cfg.slice_height, sahi_cfg.slice_width, 3), np.uint8)
+        if warmup:
+            with _inference_mode():
+                self._sahi.detection_model.perform_inference(tile)
+
+        dm = self._sahi.detection_model
+        # Batched tiles reimplement SAHI's box-only conversion; masks/OBB keep SAHI's own loop.
+        if sahi_cfg.batch > 1 and not (dm.has_mask or dm.is_obb):
+            self._sahi.slice_image = slice_image
+            self._sahi.read_image_as_pil = read_image_as_pil
+            self._sahi.object_prediction = ObjectPrediction
+            self._sahi.postprocess = POSTPROCESS_NAME_TO_CLASS[sahi_cfg.postprocess_type](
+                match_threshold=sahi_cfg.postprocess_match_threshold,
+                match_metric=sahi_cfg.postprocess_match_metric,
+                class_agnostic=False,
+            )
+            if warmup:
+                with _inference_mode():
+                    self._predict_tiles(dm, [tile] * sahi_cfg.batch)
+        return self._sahi
 
-    def _detect_with_sahi(self, image_path: Path) -> list[Detection]:
+    def _detect_with_sahi(self, image_path: Path) -> ImageDetections:
         sahi_rt = self._ensure_sahi()
 
-        result = sahi_rt.get_sliced_prediction(
-            str(image_path),
-            sahi_rt.detection_model,
-            slice_height=self._config.sahi.slice_height,
-            slice_width=self._config.sahi.slice_width,
-            overlap_height_ratio=self._config.sahi.overlap_height_ratio,
-            overlap_width_ratio=self._config.sahi.overlap_width_ratio,
-            postprocess_type=self._config.sahi.postprocess_type,
-            postprocess_match_metric=self._config.sahi.postprocess_match_metric,
-            postprocess_match_threshold=self._config.sahi.postprocess_match_threshold,
-        )
-
-        try:
-            preds = result.object_prediction_list
-        except AttributeError as e:
-            raise RuntimeError(
-                "SAHI returned unexpected prediction result: missing object_prediction_list"
-            ) from e
+        # Ultralytics' predictor already runs in inference mode; this also covers SAHI's own
+        # torch postprocessing (NMS/NMM over merged tiles).
+        image = None
+        with _inference_mode():
+            if sahi_rt.postprocess is not None:
+                preds, width, height, image = self._sliced_prediction_batched(sahi_rt, image_path)
+            else:
+                result = sahi_rt.get_sliced_prediction(
+                    str(image_path),
+                    sahi_rt.detection_model,
+                    slice_height=self._config.sahi.slice_height,
+                    slice_width=self._config.sahi.slice_width,
+                    overlap_height_ratio=self._config.sahi.overlap_height_ratio,
+                    overlap_width_ratio=self._config.sahi.overlap_width_ratio,
+                    postprocess_type=self._config.sahi.postprocess_type,
+                    postprocess_match_metric=self._config.sahi.postprocess_match_metric,
+                    postprocess_match_threshold=self._config.sahi.postprocess_match_threshold,
+                )
+                try:
+                    preds = result.object_prediction_list
+                except AttributeError as e:
+                    raise RuntimeError(
+                        "SAHI returned unexpected prediction result: missing object_prediction_list"
+                    ) from e
+                # SAHI decoded the image once for slicing; its size is the frame the boxes are in.
+                width, height = int(result.image_width), int(result.image_height)
         if preds is None:
             raise RuntimeError("SAHI returned unexpected prediction result: object_prediction_list is None")
 
-        detections: list[tuple[tuple[float, float, float, float], float]] = []
-        for pred in preds:
-            if not _is_person_prediction(pred):
-                continue
-            try:
-                bbox = pred.bbox
-            except AttributeError:
-                continue
-            if bbox is None:
-                continue
-
-            try:
-                minx = float(bbox.minx)
-                miny = float(bbox.miny)
-                maxx = float(bbox.maxx)
-                maxy = float(bbox.maxy)
-            except AttributeError:
-                continue
-
-            score = 0.0
-            try:
-                score_attr = pred.score
-                try:
-                    score = float(score_attr.value)
-                except Exception:
-                    score = float(score_attr)
-            except Exception:
-                score = 0.0
+        rows = [row for row in map(_sahi_prediction_row, preds) if row is not None]
+        if not rows:
+            return ImageDetections([], width=width, height=height, image=image)
 
-            detections.append(((minx, miny, maxx, maxy), score))
+        # (N, 6): minx, miny, maxx, maxy, score, is_person
+        arr = np.asarray(rows, dtype=np.float64)
+        arr = arr[arr[:, 5] > 0.0]
+        order = _top_k_desc(arr[:, 4], self._config.model.max_det)
+        return ImageDetections(
+            _detections_from_rows(arr[order]), width=width, height=height, image=image
+        )
 
-        detections.sort(key=lambda x: x[1], reverse=True)
-        return [
-            Detection(id=i, bbox=bbox, score=score)
-            for i, (bbox, score) in enumerate(detections[: self._config.model.max_det])
-        ]
+    def _sliced_prediction_batched(
+        self, sahi_rt: _SahiRuntime, image_path: Path
+    ) -> tuple[list[Any], int, int, np.ndarray | None]:
+        """
+        Same steps as SAHI's `get_sliced_prediction` (slice, predict every tile, predict the full
+        image, merge with the configured postprocess), but tiles reach the model `sahi.batch` at a
+        time instead of one by one. Returns `(object predictions, width, height, BGR frame)`; the
+        frame is only kept when visualization is enabled.
+        """
+        sahi_cfg = self._config.sahi
+        dm = sahi_rt.detection_model
+        image = sahi_rt.read_image_as_pil(str(image_path))  # EXIF-transposed RGB, read once
+        sliced = sahi_rt.slice_image(
+            image=image,
+            slice_height=sahi_cfg.slice_height,
+            slice_width=sahi_cfg.slice_width,
+            overlap_height_ratio=sahi_cfg.overlap_height_ratio,
+            overlap_width_ratio=sahi_cfg.overlap_width_ratio,
+        )
+        full_shape = [sliced.original_image_height, sliced.original_image_width]
+        tiles = sliced.images
+        shifts = sliced.starting_pixels
+
+        preds: list[Any] = []
+        batch = sahi_cfg.batch
+        for start in range(0, len(tiles), batch):
+            chunk_rows = self._predict_tiles(dm, tiles[start : start + batch])
+            for rows, shift in zip(chunk_rows, shifts[start : start + batch], strict=True):
+                preds.extend(
+                    p.get_shifted_object_prediction()
+                    for p in _object_predictions(sahi_rt, rows, shift, full_shape)
+                )
+        # SAHI's `perform_standard_pred`: one extra pass over the whole image for large objects.
+        if len(tiles) > 1:
+            rows = self._predict_tiles(dm, [np.ascontiguousarray(image)])[0]
+            preds.extend(_object_predictions(sahi_rt, rows, [0, 0], full_shape))
+        if len(preds) > 1:
+            preds = sahi_rt.postprocess(preds)
+        frame = np.asarray(image)[:, :, ::-1] if self._keep_images else None
+        return preds, full_shape[1], full_shape[0], frame
+
+    def _predict_tiles(self, detection_model: Any, tiles: list[np.ndarray]) -> list[np.ndarray]:
+        """
+        One Ultralytics call over RGB `tiles` with the arguments SAHI's `perform_inference` uses;
+        returns an `(N, 6)` xyxy/score/class array per tile.
+        """
+        kwargs: dict[str, Any] = {
+            "cfg": detection_model.config_path,
+            "verbose": False,
+            "conf": detection_model.confidence_threshold,
+            "device": detection_model.device,
+        }
+        if detection_model.image_size is not None:
+            kwargs["imgsz"] = detection_model.image_size
+        # YOLO expects BGR arrays (tiles are views into the image; SAHI copies them as well). A list
+        # of arrays is predicted as one batch.
+        bgr = [np.ascontiguousarray(t)[:, :, ::-1] for t in tiles]
+        results = detection_model.model(bgr, **kwargs)
+        return [_to_numpy(r.boxes.data).reshape(-1, 6) for r in results]
 
     def _ensure_ultralytics_model(self) -> Any:
         if self._ultralytics_model is not None:
@@ -197,62 +405,365 @@ class YoloSahiPersonDetector:
                 "Missing dependency: ultralytics. Install with `uv sync` (see README)."
             ) from e
 
-        weights = self._resolve_weights_arg()
-        self._ultralytics_model = YOLO(weights)
-        return self._ultralytics_model
+        weights = self._resolve_inference_weights(for_sahi=False)
+        model = YOLO(weights)
+        if self._use_half() and _is_cuda_device(self._config.model.device):
+            _to_channels_last(model)
+
+        # On GPU, warm up with one dummy image so predictor setup (layer fusing, FP16 cast) and
+        # cuDNN autotuning are paid at load time instead of on the first real image. On CPU it
+        # would only add a full inference to startup.
+        _enable_cudnn_benchmark(self._config.model.device)
+        if _is_accelerator_device(self._config.model.device):
+            imgsz = self._config.model.imgsz
+            with _inference_mode():
+                model.predict(
+                    source=np.zeros((imgsz, imgsz, 3), np.uint8),
+                    conf=self._config.model.confidence_threshold,
+                    iou=self._config.model.iou_threshold,
+                    device=self._config.model.device,
+                    imgsz=imgsz,
+                    max_det=self._config.model.max_det,
+                    half=self._use_half(),
+                    verbose=False,
+                )
+        self._ultralytics_model = model
+        return model
 
-    def _detect_full_image(self, image_path: Path) -> list[Detection]:
+    def _detect_full_images(self, image_paths: list[Path]) -> list[ImageDetections]:
         model = self._ensure_ultralytics_model()
+        batch = self._config.model.batch
 
-        results = model.predict(
-            source=str(image_path),
-            conf=self._config.model.confidence_threshold,
-            iou=self._config.model.iou_threshold,
-            device=self._config.model.device,
-            imgsz=self._config.model.imgsz,
-            max_det=self._config.model.max_det,
-            verbose=False,
-        )
+        out: list[ImageDetections] = []
+        for start in range(0, len(image_paths), batch):
+            chunk = image_paths[start : start + batch]
+            out.extend(self._predict(model, [str(p) for p in chunk], len(chunk)))
+        return out
 
-        if not results:
-            return []
+    def _predict(self, model: Any, source: list[Any], count: int) -> list[ImageDetections]:
+        """
+        Runs one Ultralytics `predict` over `source` (paths or decoded BGR arrays) as one batch.
+        """
+        with _inference_mode():
+            results = model.predict(
+                source=source,
+                conf=self._config.model.confidence_threshold,
+                iou=self._config.model.iou_threshold,
+                device=self._config.model.device,
+                imgsz=self._config.model.imgsz,
+                max_det=self._config.model.max_det,
+                batch=count,
+                half=self._use_half(),
+                stream=False,
+                verbose=False,
+            )
+        results = list(results or [])
+        if len(results) != count:
+            raise RuntimeError(
+                f"Ultralytics returned {len(results)} results for a batch of {count} images"
+            )
+        # `orig_shape` is the (height, width) of the image Ultralytics decoded; `orig_img` is that
+        # BGR image itself.
+        return [
+            ImageDetections(
+                detections,
+                width=int(r.orig_shape[1]),
+                height=int(r.orig_shape[0]),
+                image=r.orig_img if self._keep_images else None,
+            )
+            for r, detections in zip(results, _parse_ultralytics_results(results), strict=True)
+        ]
 
-        # Ultralytics result parsing (YOLOv8+)
-        result0 = results[0]
-        boxes = getattr(result0, "boxes", None)
-        if boxes is None:
-            return []
 
-        xyxy = getattr(boxes, "xyxy", None)
-        conf = getattr(boxes, "conf", None)
-        cls = getattr(boxes, "cls", None)
-        if xyxy is None or conf is None or cls is None:
-            return []
+def _chunked(items: Iterable[Path], size: int) -> Iterator[list[Path]]:
+    it = iter(items)
+    while chunk := list(islice(it, size)):
+        yield chunk
+
+
+def _read_images(paths: list[Path]) -> list[np.ndarray]:
+    """
+    Decodes images to BGR arrays with Ultralytics' own reader (same result as passing the paths).
+    """
+    from ultralytics.utils.patches import imread  # type: ignore[import-not-found]
+
+    images: list[np.ndarray] = []
+    for path in paths:
+        im = imread(str(path))
+        if im is None:
+            raise FileNotFoundError(f"Image not readable: {path}")
+        images.append(im)
+    return images
+
+
+def _parse_ultralytics_results(results: list[Any]) -> list[list[Detection]]:
+    """
+    Person detections of each Ultralytics (YOLOv8+) result, score-sorted.
+
+    The box tensors of the whole batch are concatenated and copied to the host in one transfer,
+    then split and filtered per image with NumPy, instead of one device sync per image.
+    """
+    # `boxes.data` rows: xyxy, [track id,] conf, cls (see `Boxes.conf` / `Boxes.cls`).
+    datas = [getattr(getattr(r, "boxes", None), "data", None) for r in results]
+    present = [d for d in datas if d is not None]
+    if not present:
+        return [[] for _ in results]
+    if len(present) == 1:
+        host = _to_numpy(present[0])
+    elif hasattr(present[0], "cpu"):
+        import torch  # type: ignore[import-not-found]
+
+        host = _to_numpy(torch.cat(present))
+    else:
+        host = np.concatenate([np.asarray(d) for d in present])
+    chunks = iter(np.split(host, np.cumsum([len(d) for d in present])[:-1]))
+
+    out: list[list[Detection]] = []
+    for data in datas:
+        if data is None:
+            out.append([])
+            continue
+        chunk = next(chunks)
+        person = chunk[chunk[:, -1] == PERSON_CLASS_ID]
+        rows = np.column_stack((person[:, :4], person[:, -2])).astype(np.float64, copy=False)
+        order = np.argsort(-rows[:, 4], kind="stable")
+        out.append(_detections_from_rows(rows[order]))
+    return out
+
+
+def _to_numpy(values: Any) -> np.ndarray:
+    """
+    Host NumPy view of a torch tensor (any device) or array-like.
+    """
+    if hasattr(values, "cpu"):
+        values = values.cpu()
+    if hasattr(values, "numpy"):
+        values = values.numpy()
+    return np.asarray(values)
+
+
+def _configure_kernel_caches(project_root: Path) -> None:
+    """
+    Points Triton / PyTorch JIT kernel caches at `data/weights/.cache/` so compiled kernels survive
+    across CLI runs. Must run before torch initializes CUDA; explicit user env vars win.
+    """
+    cache_root = project_root / "data" / "weights" / ".cache"
+    for env_var, subdir in (
+        ("TRITON_CACHE_DIR", "triton"),
+        ("PYTORCH_KERNEL_CACHE_PATH", "torch_kernels"),
+    ):
+        if os.environ.get(env_var):
+            continue
+        cache_dir = cache_root / subdir
+        try:
+            cache_dir.mkdir(parents=True, exist_ok=True)
+        except OSError:  # pragma: no cover
+            continue
+        os.environ[env_var] = str(cache_dir)
+
+
+def _configure_torch_threads(threads: int) -> None:
+    """
+    Caps PyTorch's CPU thread pools (`model.torch_threads`, 0 = leave PyTorch's defaults) so several
+    instances on one machine don't oversubscribe the cores.
+    """
+    if threads <= 0:
+        return
+    try:
+        import torch  # type: ignore[import-not-found]
+    except ModuleNotFoundError:  # pragma: no cover
+        return
+    torch.set_num_threads(threads)
+    try:
+        torch.set_num_interop_threads(max(1, threads // 2))
+    except RuntimeError:  # pragma: no cover
+        # Only settable before the first inter-op parallel work in this process.
+        LOGGER.warning("torch inter-op thread count already fixed; keeping it")
 
-        detections: list[tuple[tuple[float, float, float, float], float]] = []
-        for coords, score, class_id in zip(xyxy.tolist(), conf.tolist(), cls.tolist(), strict=False):
-            if int(class_id) != 0:
-                continue
-            minx, miny, maxx, maxy = (float(coords[0]), float(coords[1]), float(coords[2]), float(coords[3]))
-            detections.append(((minx, miny, maxx, maxy), float(score)))
 
-        detections.sort(key=lambda x: x[1], reverse=True)
-        return [Detection(id=i, bbox=bbox, score=score) for i, (bbox, score) in enumerate(detections)]
+def _inference_mode() -> contextlib.AbstractContextManager[Any]:
+    """
+    `torch.inference_mode()` (no autograd graph, version counters or view tracking), or a no-op
+    context when torch is not importable.
+    """
+    try:
+        import torch  # type: ignore[import-not-found]
+    except ModuleNotFoundError:  # pragma: no cover
+        return contextlib.nullcontext()
+    return torch.inference_mode()
 
 
-def _is_person_prediction(pred: Any) -> bool:
-    category = getattr(pred, "category", None)
-    if category is None:
-        return False
+def _is_cuda_device(device: str) -> bool:
+    d = device.strip().lower()
+    return d.startswith("cuda") or d[:1].isdigit()
 
-    name = getattr(category, "name", None)
-    if isinstance(name, str) and name.lower() == "person":
+
+def _is_accelerator_device(device: str) -> bool:
+    """
+    CUDA or Apple MPS: the devices where a warmup inference pays for itself.
+    """
+    return _is_cuda_device(device) or device.strip().lower().startswith("mps")
+
+
+def _to_channels_last(model: Any) -> None:
+    """
+    Converts the PyTorch module behind a `YOLO` object to NHWC (`channels_last`), the layout of
+    cuDNN's fastest FP16 Tensor Core conv kernels. Exported ONNX/engine models are left alone.
+    """
+    try:
+        import torch  # type: ignore[import-not-found]
+    except ModuleNotFoundError:  # pragma: no cover
+        return
+    module = getattr(model, "model", None)
+    if not isinstance(module, torch.nn.Module):
+        return
+    try:
+        model.model = module.to(memory_format=torch.channels_last)
+    except Exception as e:  # pragma: no cover
+        LOGGER.warning("channels_last conversion failed, keeping default layout: %s", e)
+
+
+def _enable_cudnn_benchmark(device: str) -> None:
+    """
+    Lets cuDNN pick the fastest convolution algorithms per input shape. Inference shapes are
+    stable (fixed `imgsz` letterbox / SAHI tile size), so the one-time search per shape pays off.
+    """
+    if not _is_cuda_device(device):
+        return
+    try:
+        import torch  # type: ignore[import-not-found]
+    except ModuleNotFoundError:  # pragma: no cover
+        return
+    torch.backends.cudnn.benchmark = True
+
+
+def _device_supports_half(device: str) -> bool:
+    """
+    FP16 only pays off on MPS and on CUDA GPUs with compute capability >= 7.0 (Volta/Turing+);
+    older cards have no fast FP16 path.
+    """
+    d = device.strip().lower()
+    if d.startswith("mps"):
         return True
+    if d.startswith("cuda"):
+        d = d[len("cuda") :].lstrip(":")
+    elif not d[:1].isdigit():
+        return False
 
-    category_id = getattr(category, "id", None)
-    if category_id is None:
+    try:
+        import torch  # type: ignore[import-not-found]
+    except ModuleNotFoundError:  # pragma: no cover
         return False
+    if not torch.cuda.is_available():
+        return False
+
+    first = d.split(",")[0].strip()
+    index = int(first) if first.isdigit() else 0
+    try:
+        return tuple(torch.cuda.get_device_capability(index)) >= (7, 0)
+    except Exception:  # pragma: no cover
+        return False
+
+
+def _object_predictions(
+    sahi_rt: _SahiRuntime, rows: np.ndarray, shift: list[int], full_shape: list[int]
+) -> list[Any]:
+    """
+    SAHI `ObjectPrediction`s for one tile's `(N, 6)` rows, built like SAHI's Ultralytics model
+    does (boxes clamped to the full image shape, degenerate boxes dropped).
+    """
+    category_mapping = sahi_rt.detection_model.category_mapping
+    full_h, full_w = full_shape
+    out: list[Any] = []
+    for minx, miny, maxx, maxy, score, cls in rows.tolist():
+        bbox = [
+            min(full_w, max(0, minx)),
+            min(full_h, max(0, miny)),
+            min(full_w, max(0, maxx)),
+            min(full_h, max(0, maxy)),
+        ]
+        if not (bbox[0] < bbox[2]) or not (bbox[1] < bbox[3]):
+            continue
+        category_id = int(cls)
+        out.append(
+            sahi_rt.object_prediction(
+                bbox=bbox,
+                category_id=category_id,
+                score=score,
+                segmentation=None,
+                category_name=category_mapping[str(category_id)],
+                shift_amount=shift,
+                full_shape=full_shape,
+            )
+        )
+    return out
+
+
+def _sahi_prediction_row(pred: Any) -> tuple[float, float, float, float, float, float] | None:
+    """
+    Flattens one SAHI `ObjectPrediction` to `(minx, miny, maxx, maxy, score, is_person)`.
+
+    Returns None when the prediction has no usable bbox.
+    """
+    bbox = getattr(pred, "bbox", None)
+    if bbox is None:
+        return None
+    try:
+        minx = float(bbox.minx)
+        miny = float(bbox.miny)
+        maxx = float(bbox.maxx)
+        maxy = float(bbox.maxy)
+    except AttributeError:
+        return None
+
+    score = 0.0
     try:
-        return int(category_id) == 0
-    except (TypeError, ValueError):
+        score_attr = pred.score
+        try:
+            score = float(score_attr.value)
+        except Exception:
+            score = float(score_attr)
+    except Exception:
+        score = 0.0
+
+    return (minx, miny, maxx, maxy, score, 1.0 if _is_person_prediction(pred) else 0.0)
+
+
+def _top_k_desc(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Indices of the `k` highest scores, sorted descending; ties keep their original order.
+
+    Same result as `np.argsort(-scores, kind="stable")[:k]`, but selects with a partition first so
+    only the kept `k` entries are sorted (O(n + k log k) instead of O(n log n)).
+    """
+    n = len(scores)
+    if k >= n:
+        return np.argsort(-scores, kind="stable")
+    kth = np.partition(scores, n - k)[n - k]  # k-th largest score
+    above = np.flatnonzero(scores > kth)
+    ties = np.flatnonzero(scores == kth)[: k - len(above)]
+    idx = np.sort(np.concatenate([above, ties]))
+    return idx[np.argsort(-scores[idx], kind="stable")]
+
+
+def _detections_from_rows(rows: np.ndarray) -> list[Detection]:
+    """
+    Builds `Detection`s (ids in row order) from score-sorted `(N, >=5)` bbox+score rows.
+    """
+    return [
+        Detection(id=i, bbox=(row[0], row[1], row[2], row[3]), score=row[4])
+        for i, row in enumerate(rows[:, :5].tolist())
+    ]
+
+
+def _is_person_prediction(pred: Any) -> bool:
+    # Hot path (called per raw SAHI candidate): one int compare first, name lookup only as fallback.
+    try:
+        category = pred.category
+        category_id = category.id
+    except AttributeError:
         return False
+    if category_id == PERSON_CLASS_ID:
+        return True
+    name = getattr(category, "name", None)
+    return isinstance(name, str) and name.lower() == "person"
@@ -1,11 +1,26 @@
 from __future__ import annotations
 
-from collections.abc import Callable
+import math
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
 from dataclasses import dataclass
+from functools import cache
+from pathlib import Path
 from typing import Any
 
-from PySide6.QtCore import QLineF, QPointF, QRectF, Qt, Signal
-from PySide6.QtGui import QColor, QCursor, QPainter, QPen, QPixmap
+from PySide6.QtCore import (
+    QLineF,
+    QObject,
+    QPointF,
+    QRectF,
+    QRunnable,
+    QSize,
+    Qt,
+    QThreadPool,
+    QTimer,
+    Signal,
+)
+from PySide6.QtGui import QBrush, QColor, QCursor, QImage, QPainter, QPen, QPixmap
 from PySide6.QtWidgets import (
     QGraphicsItem,
     QGraphicsLineItem,
@@ -14,16 +29,48 @@ from PySide6.QtWidgets import (
     QGraphicsView,
 )
 
+from picture_annotator.gui.store import BoxAnnotation
+
 GREEN = QColor(0, 255, 0)
 # A stronger orange for better visibility on bright images.
 ORANGE = QColor(255, 120, 0)
 ORANGE_CROSSHAIR = QColor(255, 120, 0, 200)
 
+# Zoom per standard wheel notch (120 angle-delta units); trackpads send fractions of a notch.
+ZOOM_STEP = 1.15
+# Accumulated zoom below this (|log factor|, ~1%) is not applied yet: avoids sub-pixel rescales.
+ZOOM_DEADBAND = math.log(1.01)
+
+# Decoded pixmaps kept around: current image plus a couple of neighbors in each direction.
+PIXMAP_CACHE_SIZE = 6
+
 
 def _clamp(value: float, low: float, high: float) -> float:
     return max(low, min(value, high))
 
 
+def _cosmetic_pen(color: QColor, width: int = 1) -> QPen:
+    pen = QPen(color)
+    pen.setCosmetic(True)
+    pen.setWidth(width)
+    return pen
+
+
+# Pens/brushes are implicitly shared by Qt: handing every item the same instance is a refcount bump,
+# whereas building them per item costs several allocations per box on every `set_boxes()`.
+@cache
+def _box_pens(line_width: int) -> tuple[QPen, QPen]:
+    """
+    (normal, selected) pens for a `BBoxItem` of the given line width.
+    """
+    return _cosmetic_pen(GREEN, line_width), _cosmetic_pen(ORANGE, line_width + 2)
+
+
+@cache
+def _handle_style() -> tuple[QPen, QBrush]:
+    return _cosmetic_pen(ORANGE), QBrush(ORANGE)
+
+
 @dataclass(frozen=True, slots=True)
 class BBox:
     xmin: float
@@ -42,9 +89,8 @@ class CornerHandle(QGraphicsRectItem):
         self.corner = corner  # "tl" or "br"
         self._updating = False
 
-        self.setBrush(ORANGE)
-        pen = QPen(ORANGE)
-        pen.setCosmetic(True)
+        pen, brush = _handle_style()
+        self.setBrush(brush)
         self.setPen(pen)
 
         self.setFlag(QGraphicsItem.GraphicsItemFlag.ItemIsMovable, True)
@@ -86,10 +132,10 @@ class BBoxItem(QGraphicsRectItem):
     def __init__(
         self,
         *,
-        det: dict[str, Any],
+        det: BoxAnnotation,
         image_width: int,
         image_height: int,
-        on_edited: Callable[[dict[str, Any]], None] | None = None,
+        on_edited: Callable[[BoxAnnotation], None] | None = None,
         line_width: int = 2,
     ) -> None:
         super().__init__()
@@ -99,13 +145,7 @@ class BBoxItem(QGraphicsRectItem):
         self.min_size = 1.0
         self._on_edited = on_edited
 
-        self._pen_normal = QPen(GREEN)
-        self._pen_normal.setCosmetic(True)
-        self._pen_normal.setWidth(int(line_width))
-
-        self._pen_selected = QPen(ORANGE)
-        self._pen_selected.setCosmetic(True)
-        self._pen_selected.setWidth(int(line_width) + 2)
+        self._pen_normal, self._pen_selected = _box_pens(int(line_width))
 
         self.setPen(self._pen_normal)
         self.setBrush(Qt.BrushStyle.NoBrush)
@@ -119,9 +159,38 @@ class BBoxItem(QGraphicsRectItem):
 
         self.update_from_det()
 
+    def rebind(
+        self,
+        *,
+        det: BoxAnnotation,
+        image_width: int,
+        image_height: int,
+        on_edited: Callable[[BoxAnnotation], None] | None = None,
+    ) -> None:
+        """
+        Reuses this item (and its handles) for another detection instead of allocating new ones.
+        """
+        self.setSelected(False)
+        self.det = det
+        self.image_width = int(image_width)
+        self.image_height = int(image_height)
+        self._on_edited = on_edited
+        self.update_from_det()
+        self.setVisible(True)
+
+    def release(self) -> None:
+        """
+        Parks a pooled item: hidden items are neither drawn nor hit-tested/selectable.
+        """
+        self.setSelected(False)
+        self.setVisible(False)
+        self.tl.setVisible(False)
+        self.br.setVisible(False)
+        self._on_edited = None
+
     def update_from_det(self) -> None:
-        bbox = self.det.get("bbox", [0, 0, 1, 1])
-        xmin, ymin, xmax, ymax = (float(bbox[0]), float(bbox[1]), float(bbox[2]), float(bbox[3]))
+        det = self.det
+        xmin, ymin, xmax, ymax = det.xmin, det.ymin, det.xmax, det.ymax
         self.setRect(QRectF(xmin, ymin, max(1.0, xmax - xmin), max(1.0, ymax - ymin)))
         self.tl.set_center(QPointF(xmin, ymin))
         self.br.set_center(QPointF(xmax, ymax))
@@ -135,18 +204,16 @@ class BBoxItem(QGraphicsRectItem):
         return super().itemChange(change, value)
 
     def constrain_handle(self, corner: str, pos: QPointF) -> QPointF:
-        tl = self.tl.pos()
-        br = self.br.pos()
-        w = float(self.image_width)
-        h = float(self.image_height)
-
+        # Called on every drag move: min/max inline instead of helper calls.
+        m = self.min_size
         if corner == "tl":
-            x = _clamp(pos.x(), 0.0, br.x() - self.min_size)
-            y = _clamp(pos.y(), 0.0, br.y() - self.min_size)
-            return QPointF(x, y)
-        x = _clamp(pos.x(), tl.x() + self.min_size, w)
-        y = _clamp(pos.y(), tl.y() + self.min_size, h)
-        return QPointF(x, y)
+            br = self.br.pos()
+            return QPointF(max(0.0, min(pos.x(), br.x() - m)), max(0.0, min(pos.y(), br.y() - m)))
+        tl = self.tl.pos()
+        return QPointF(
+            max(tl.x() + m, min(pos.x(), self.image_width)),
+            max(tl.y() + m, min(pos.y(), self.image_height)),
+        )
 
     def on_handle_moved(self, corner: str) -> None:
         _ = corner
@@ -154,25 +221,65 @@ class BBoxItem(QGraphicsRectItem):
         br = self.br.pos()
         rect = QRectF(tl.x(), tl.y(), br.x() - tl.x(), br.y() - tl.y())
         self.setRect(rect)
-        self.det["bbox"] = [rect.left(), rect.top(), rect.right(), rect.bottom()]
+        self.det.set_bbox(rect.left(), rect.top(), rect.right(), rect.bottom())
 
     def notify_edited(self) -> None:
         if self._on_edited is not None:
             self._on_edited(self.det)
 
 
+class _DecodeSignals(QObject):
+    decoded = Signal(str, QImage)  # path, image (null on failure)
+
+
+class _DecodeTask(QRunnable):
+    """
+    Decodes an image file into a `QImage` on a pool thread (`QPixmap` may only be created on the
+    GUI thread).
+    """
+
+    def __init__(self, path: str, signals: _DecodeSignals) -> None:
+        super().__init__()
+        self._path = path
+        self._signals = signals
+
+    def run(self) -> None:
+        image = QImage(self._path)
+        if not image.isNull():
+            # Pre-convert to the raster paint engine's native formats so `fromImage` is a cheap copy.
+            fmt = (
+                QImage.Format.Format_ARGB32_Premultiplied
+                if image.hasAlphaChannel()
+                else QImage.Format.Format_RGB32
+            )
+            if image.format() != fmt:
+                image = image.convertToFormat(fmt)
+        try:
+            self._signals.decoded.emit(self._path, image)
+        except RuntimeError:  # pragma: no cover
+            pass  # canvas already destroyed (app shutting down)
+
+
 class ImageCanvas(QGraphicsView):
-    boxSelectionChanged = Signal(object)  # det dict | None
-    boxEdited = Signal(object)  # det dict
+    boxSelectionChanged = Signal(object)  # BoxAnnotation | None
+    boxEdited = Signal(object)  # BoxAnnotation
     boxCreated = Signal(tuple)  # (xmin,ymin,xmax,ymax)
+    imageLoadFailed = Signal(str)  # image path
 
     def __init__(self) -> None:
         super().__init__()
         self.setRenderHint(QPainter.RenderHint.Antialiasing, True)
         self._drag_mode_default = QGraphicsView.DragMode.ScrollHandDrag
         self.setDragMode(self._drag_mode_default)
+        # Zoom around the cursor; `scale()` then keeps the point under the mouse fixed itself.
+        self.setTransformationAnchor(QGraphicsView.ViewportAnchor.AnchorUnderMouse)
+        self.setResizeAnchor(QGraphicsView.ViewportAnchor.AnchorUnderMouse)
+        self._pending_zoom_log = 0.0
 
         self._scene = QGraphicsScene(self)
+        # The scene is small but churns constantly (crosshair, handles, rebinding pooled boxes), so
+        # keeping a BSP tree up to date costs more than a linear scan for hit-testing.
+        self._scene.setItemIndexMethod(QGraphicsScene.ItemIndexMethod.NoIndex)
         self.setScene(self._scene)
 
         self._pixmap_item = self._scene.addPixmap(QPixmap())
@@ -182,16 +289,34 @@ class ImageCanvas(QGraphicsView):
         self._crosshair_v = QGraphicsLineItem()
         self._init_crosshair()
 
-        self._items: list[BBoxItem] = []
-        self._det_to_item: dict[int, BBoxItem] = {}  # key: det["id"]
+        self._items: list[BBoxItem] = []  # items bound to the current detections
+        self._item_pool: list[BBoxItem] = []  # every BBoxItem in the scene; the tail is parked
+        self._det_to_item: dict[BoxAnnotation, BBoxItem] = {}  # by identity (`eq=False`)
 
         self._image_width = 0
         self._image_height = 0
+        self._last_pixmap_size: QSize | None = None
+        self._image_bounds = QRectF()
 
         self._add_mode = False
         self._rubber_start: QPointF | None = None
         self._rubber_item: QGraphicsRectItem | None = None
 
+        # Add-mode mouse moves are coalesced to ~60 Hz: only the latest position is applied.
+        self._pending_move: QPointF | None = None
+        self._move_timer = QTimer(self)
+        self._move_timer.setSingleShot(True)
+        self._move_timer.setInterval(16)
+        self._move_timer.timeout.connect(self._apply_pending_move)
+
+        # Background decoding: results arrive on the GUI thread through a queued signal.
+        self._pixmap_cache: OrderedDict[str, QPixmap] = OrderedDict()
+        # Submitted decodes by path. Tasks are not auto-deleted, so queued ones can be withdrawn.
+        self._decoding: dict[str, _DecodeTask] = {}
+        self._wanted_path: str | None = None
+        self._decode_signals = _DecodeSignals()
+        self._decode_signals.decoded.connect(self._on_image_decoded)
+
         self._scene.selectionChanged.connect(self._on_scene_selection_changed)
 
     def _init_crosshair(self) -> None:
@@ -247,28 +372,138 @@ class ImageCanvas(QGraphicsView):
             self.setDragMode(self._drag_mode_default)
             self.unsetCursor()
             self.viewport().unsetCursor()
+            self._drop_pending_move()
             self._update_crosshair(None)
 
     def set_image(self, pixmap: QPixmap) -> None:
+        """
+        Shows `pixmap`. Same-sized images (consecutive frames) keep the current zoom/pan instead of
+        re-fitting; use `reset_view()` to re-fit explicitly.
+        """
+        self._wanted_path = None
         self._pixmap_item.setPixmap(pixmap)
-        self._scene.setSceneRect(QRectF(pixmap.rect()))
-        self._image_width = int(pixmap.width())
-        self._image_height = int(pixmap.height())
-        self.fitInView(self._scene.sceneRect(), Qt.AspectRatioMode.KeepAspectRatio)
+        self._set_image_size(pixmap.size())
         self._update_crosshair(None)
 
-    def set_boxes(self, detections: list[dict[str, Any]]) -> None:
-        for it in self._items:
-            self._scene.removeItem(it)
-            self._scene.removeItem(it.tl)
-            self._scene.removeItem(it.br)
+    def set_image_path(
+        self, path: Path, *, width: int, height: int, prefetch: Iterable[Path] = ()
+    ) -> None:
+        """
+        Shows the image at `path` without decoding it on the GUI thread.
+
+        The scene is sized to `width`x`height` right away (so boxes can be placed immediately); the
+        pixmap appears once decoded, or at once when cached. `prefetch` paths (e.g. the previous/next
+        image) are decoded in the background into the cache. Emits `imageLoadFailed` on errors.
+        """
+        key = str(path)
+        prefetch_keys = [str(p) for p in prefetch]
+        self._cancel_stale_decodes({key, *prefetch_keys})
+
+        cached = self._pixmap_cache.get(key)
+        if cached is not None:
+            self._pixmap_cache.move_to_end(key)
+            self.set_image(cached)
+        else:
+            self._wanted_path = key
+            self._pixmap_item.setPixmap(QPixmap())
+            self._set_image_size(QSize(int(width), int(height)))
+            self._update_crosshair(None)
+            self._decode(key, priority=1)
+
+        for p in prefetch_keys:
+            self._decode(p)
+
+    def _decode(self, key: str, *, priority: int = 0) -> None:
+        if key in self._pixmap_cache or key in self._decoding:
+            return
+        task = _DecodeTask(key, self._decode_signals)
+        task.setAutoDelete(False)
+        self._decoding[key] = task
+        QThreadPool.globalInstance().start(task, priority)
+
+    def _cancel_stale_decodes(self, keep: set[str]) -> None:
+        """
+        Withdraws queued (not yet running) decodes, e.g. prefetches for images skipped past while
+        holding Q/E, so the pool gets to the image that is actually wanted sooner.
+        """
+        pool = QThreadPool.globalInstance()
+        for key in [k for k in self._decoding if k not in keep]:
+            if pool.tryTake(self._decoding[key]):
+                del self._decoding[key]
+
+    def _on_image_decoded(self, key: str, image: QImage) -> None:
+        self._decoding.pop(key, None)
+        wanted = key == self._wanted_path
+        if image.isNull():
+            if wanted:
+                self._wanted_path = None
+                self.imageLoadFailed.emit(key)
+            return
+
+        pixmap = QPixmap.fromImage(image)
+        self._pixmap_cache[key] = pixmap
+        self._pixmap_cache.move_to_end(key)
+        while len(self._pixmap_cache) > PIXMAP_CACHE_SIZE:
+            self._pixmap_cache.popitem(last=False)
+
+        if wanted:
+            self.set_image(pixmap)
+
+    def _set_image_size(self, size: QSize) -> None:
+        if size == self._last_pixmap_size:
+            return
+        self._last_pixmap_size = size
+        self._image_width = int(size.width())
+        self._image_height = int(size.height())
+        self._image_bounds = QRectF(0.0, 0.0, self._image_width, self._image_height)
+        self._scene.setSceneRect(self._image_bounds)
+        self.reset_view()
+
+    def reset_view(self) -> None:
+        self._pending_zoom_log = 0.0
+        self.fitInView(self._scene.sceneRect(), Qt.AspectRatioMode.KeepAspectRatio)
+
+    def set_boxes(self, detections: list[BoxAnnotation]) -> None:
         self._items.clear()
         self._det_to_item.clear()
 
         for det in detections:
-            det_id = det.get("id")
-            if not isinstance(det_id, int):
-                continue
+            self._bind_item(det)
+
+        for item in self._item_pool[len(self._items) :]:
+            item.release()
+
+    def add_box(self, det: BoxAnnotation) -> None:
+        """
+        Shows one new detection without rebinding the others (unlike `set_boxes`).
+        """
+        self._bind_item(det)
+
+    def remove_box(self, det: BoxAnnotation) -> None:
+        """
+        Removes one detection's item; it is parked at the end of the pool for reuse.
+        """
+        item = self._det_to_item.pop(det, None)
+        if item is None:
+            return
+        self._items.remove(item)
+        # Keep the pool invariant: bound items first, parked items after them.
+        self._item_pool.remove(item)
+        self._item_pool.append(item)
+        item.release()
+
+    def _bind_item(self, det: BoxAnnotation) -> BBoxItem:
+        # `_item_pool[: len(self._items)]` are the bound items; the next one (if any) is free.
+        used = len(self._items)
+        if used < len(self._item_pool):
+            item = self._item_pool[used]
+            item.rebind(
+                det=det,
+                image_width=self._image_width,
+                image_height=self._image_height,
+                on_edited=self.boxEdited.emit,
+            )
+        else:
             item = BBoxItem(
                 det=det,
                 image_width=self._image_width,
@@ -278,19 +513,18 @@ class ImageCanvas(QGraphicsView):
             self._scene.addItem(item)
             self._scene.addItem(item.tl)
             self._scene.addItem(item.br)
-            self._items.append(item)
-            self._det_to_item[det_id] = item
+            self._item_pool.append(item)
+        self._items.append(item)
+        self._det_to_item[det] = item
+        return item
 
-    def select_detection(self, det: dict[str, Any] | None) -> None:
+    def select_detection(self, det: BoxAnnotation | None) -> None:
         self._scene.blockSignals(True)
         try:
             self._scene.clearSelection()
             if det is None:
                 return
-            det_id = det.get("id")
-            if not isinstance(det_id, int):
-                return
-            item = self._det_to_item.get(det_id)
+            item = self._det_to_item.get(det)
             if item is not None:
                 item.setSelected(True)
                 self.centerOn(item)
@@ -307,9 +541,11 @@ class ImageCanvas(QGraphicsView):
 
     def wheelEvent(self, event) -> None:  # noqa: ANN001
         if event.modifiers() & Qt.KeyboardModifier.ControlModifier:
-            delta = event.angleDelta().y()
-            factor = 1.15 if delta > 0 else 1 / 1.15
-            self.scale(factor, factor)
+            self._pending_zoom_log += event.angleDelta().y() / 120.0 * math.log(ZOOM_STEP)
+            if abs(self._pending_zoom_log) >= ZOOM_DEADBAND:
+                factor = math.exp(self._pending_zoom_log)
+                self._pending_zoom_log = 0.0
+                self.scale(factor, factor)
             event.accept()
             return
         super().wheelEvent(event)
@@ -335,18 +571,35 @@ class ImageCanvas(QGraphicsView):
 
     def mouseMoveEvent(self, event) -> None:  # noqa: ANN001
         if self._add_mode:
-            self._update_crosshair(self.mapToScene(event.pos()))
-        if self._add_mode and self._rubber_start is not None and self._rubber_item is not None:
-            cur = self.mapToScene(event.pos())
-            rect = QRectF(self._rubber_start, cur).normalized()
-            rect = self._clamp_rect(rect)
-            self._rubber_item.setRect(rect)
-            event.accept()
-            return
+            self._pending_move = self.mapToScene(event.pos())
+            if not self._move_timer.isActive():
+                self._move_timer.start()
+            if self._rubber_start is not None and self._rubber_item is not None:
+                event.accept()
+                return
         super().mouseMoveEvent(event)
 
+    def _apply_pending_move(self) -> None:
+        cur = self._pending_move
+        self._pending_move = None
+        if cur is None or not self._add_mode:
+            return
+        self._update_crosshair(cur)
+        if self._rubber_start is not None and self._rubber_item is not None:
+            rect = QRectF(self._rubber_start, cur).normalized()
+            self._rubber_item.setRect(self._clamp_rect(rect))
+
+    def _flush_pending_move(self) -> None:
+        self._move_timer.stop()
+        self._apply_pending_move()
+
+    def _drop_pending_move(self) -> None:
+        self._move_timer.stop()
+        self._pending_move = None
+
     def mouseReleaseEvent(self, event) -> None:  # noqa: ANN001
         if self._add_mode and event.button() == Qt.MouseButton.LeftButton:
+            self._flush_pending_move()
             self._update_crosshair(self.mapToScene(event.pos()))
             if self._rubber_item is not None:
                 rect = self._rubber_item.rect()
@@ -362,10 +615,16 @@ class ImageCanvas(QGraphicsView):
 
     def leaveEvent(self, event) -> None:  # noqa: ANN001
         if self._add_mode:
+            self._drop_pending_move()
             self._update_crosshair(None)
         super().leaveEvent(event)
 
     def _clamp_rect(self, rect: QRectF) -> QRectF:
+        # Common case: one Qt intersection. Falls through for rects that end up thinner than 1px.
+        clipped = rect.intersected(self._image_bounds)
+        if clipped.width() >= 1.0 and clipped.height() >= 1.0:
+            return clipped
+
         w = float(self._image_width)
         h = float(self._image_height)
         left = _clamp(rect.left(), 0.0, max(w - 1.0, 0.0))
@@ -1,11 +1,21 @@
 from __future__ import annotations
 
+import os
 import sys
 from pathlib import Path
 from typing import Any
 
-from PySide6.QtCore import QItemSelectionModel, Qt
-from PySide6.QtGui import QAction, QKeySequence, QPixmap, QShortcut
+from PySide6.QtCore import (
+    QCoreApplication,
+    QItemSelectionModel,
+    QObject,
+    QRunnable,
+    Qt,
+    QThreadPool,
+    QTimer,
+    Signal,
+)
+from PySide6.QtGui import QAction, QKeySequence, QShortcut
 from PySide6.QtWidgets import (
     QApplication,
     QHBoxLayout,
@@ -23,8 +33,14 @@ from PySide6.QtWidgets import (
 
 from picture_annotator.config import load_config
 from picture_annotator.gui.canvas import ImageCanvas
-from picture_annotator.gui.models import BoxListModel, ImageListModel
-from picture_annotator.gui.store import AnnotationSession, AnnotationStore, ImageEntry
+from picture_annotator.gui.models import BoxListModel, ImageFilterProxyModel, ImageListModel
+from picture_annotator.gui.store import (
+    AnnotationSession,
+    AnnotationStore,
+    BoxAnnotation,
+    ImageEntry,
+    write_json_atomic,
+)
 
 
 def _app_root() -> Path:
@@ -35,6 +51,33 @@ def _app_root() -> Path:
     return Path(__file__).resolve().parents[3]
 
 
+class _SaveSignals(QObject):
+    finished = Signal(object, object, object)  # json_path, payload, os.stat_result | Exception
+
+
+class _SaveTask(QRunnable):
+    """
+    Writes one annotation payload on the save pool's thread, so slow disks don't stall image
+    switching.
+    """
+
+    def __init__(self, path: Path, payload: dict[str, Any], signals: _SaveSignals) -> None:
+        super().__init__()
+        self._path = path
+        self._payload = payload
+        self._signals = signals
+
+    def run(self) -> None:
+        try:
+            result: os.stat_result | Exception = write_json_atomic(self._path, self._payload)
+        except Exception as e:
+            result = e
+        try:
+            self._signals.finished.emit(self._path, self._payload, result)
+        except RuntimeError:  # pragma: no cover
+            pass  # window already destroyed (app shutting down)
+
+
 class MainWindow(QMainWindow):
     def __init__(self) -> None:
         super().__init__()
@@ -48,10 +91,16 @@ class MainWindow(QMainWindow):
         self._store = AnnotationStore(app_root=self._root, config=self._config)
 
         self._images = self._store.list_images()
-        self._images_model = ImageListModel(self._images)
+        self._images_model = ImageFilterProxyModel(ImageListModel(self._images))
         self._boxes_model = BoxListModel()
 
         self._current: AnnotationSession | None = None
+
+        # A single writer thread keeps saves landing on disk in the order they were made.
+        self._save_pool = QThreadPool(self)
+        self._save_pool.setMaxThreadCount(1)
+        self._save_signals = _SaveSignals()
+        self._save_signals.finished.connect(self._on_save_finished)
         self._sync_selection = False
         self._switching_image = False
 
@@ -155,11 +204,17 @@ class MainWindow(QMainWindow):
         self.canvas.boxSelectionChanged.connect(self._on_canvas_selection_changed)
         self.canvas.boxEdited.connect(self._on_box_edited)
         self.canvas.boxCreated.connect(self._on_box_created)
+        self.canvas.imageLoadFailed.connect(self._on_image_load_failed)
 
         self.view_images.selectionModel().currentChanged.connect(self._on_image_selected)
         self.view_boxes.selectionModel().currentChanged.connect(self._on_box_selected_in_list)
 
-        self.txt_search.textChanged.connect(self._apply_image_filter)
+        # Debounced: a burst of keystrokes triggers a single filter pass with the latest text.
+        self._filter_timer = QTimer(self)
+        self._filter_timer.setSingleShot(True)
+        self._filter_timer.setInterval(120)
+        self._filter_timer.timeout.connect(self._apply_pending_image_filter)
+        self.txt_search.textChanged.connect(self._schedule_image_filter)
 
     def _install_letter_shortcuts(self) -> None:
         self.canvas.setFocusPolicy(Qt.FocusPolicy.StrongFocus)
@@ -179,15 +234,21 @@ class MainWindow(QMainWindow):
         suffix = " *" if dirty else ""
         self.setWindowTitle(f"标注编辑器{suffix}")
 
+    def _schedule_image_filter(self, _text: str) -> None:
+        self._filter_timer.start()
+
+    def _apply_pending_image_filter(self) -> None:
+        self._apply_image_filter(self.txt_search.text())
+
     def _apply_image_filter(self, text: str) -> None:
-        t = text.strip().lower()
-        if not t:
-            self._images_model = ImageListModel(self._images)
-        else:
-            filtered = [e for e in self._images if t in e.relative_path.lower()]
-            self._images_model = ImageListModel(filtered)
-        self.view_images.setModel(self._images_model)
-        self.view_images.selectionModel().currentChanged.connect(self._on_image_selected)
+        # Drop the current row first if it is about to be filtered out; otherwise the selection
+        # model would move it to a neighbor and switch images while the user is typing.
+        idx = self.view_images.currentIndex()
+        if idx.isValid():
+            entry: ImageEntry = idx.data(Qt.ItemDataRole.UserRole)
+            if text.strip().lower() not in entry.relative_path_lower:
+                self.view_images.selectionModel().clearCurrentIndex()
+        self._images_model.set_filter_text(text)
 
     def _on_image_selected(self, current, previous) -> None:  # noqa: ANN001
         if self._switching_image:
@@ -218,12 +279,12 @@ class MainWindow(QMainWindow):
         session, report = self._store.load(entry)
         self._current = session
 
-        pixmap = QPixmap(str(entry.image_path))
-        if pixmap.isNull():
-            QMessageBox.critical(self, "错误", f"无法打开图片：{entry.image_path}")
-            return
-
-        self.canvas.set_image(pixmap)
+        self.canvas.set_image_path(
+            entry.image_path,
+            width=session.width,
+            height=session.height,
+            prefetch=self._neighbor_paths(entry),
+        )
         self._boxes_model.set_detections(session.detections)
         self.canvas.set_boxes(session.detections)
         self.canvas.setFocus()
@@ -247,20 +308,59 @@ class MainWindow(QMainWindow):
 
         self._update_title()
 
+    def _neighbor_paths(self, entry: ImageEntry) -> list[Path]:
+        row = self._current_image_row()
+        if row is None or self._images_model.entry_at(row).image_path != entry.image_path:
+            return []
+        rows = (row + 1, row - 1)
+        return [
+            self._images_model.entry_at(r).image_path
+            for r in rows
+            if 0 <= r < self._images_model.rowCount()
+        ]
+
+    def _on_image_load_failed(self, path: str) -> None:
+        QMessageBox.critical(self, "错误", f"无法打开图片：{path}")
+
     def _save_current(self) -> bool:
+        """
+        Queue the current session's write on the save pool; the outcome arrives in
+        `_on_save_finished`.
+        """
         if self._current is None:
             return True
         try:
-            self._store.save(self._current)
-            self.statusBar().showMessage("已保存。")
-            self._update_title()
-            return True
+            job = self._store.begin_save(self._current)
         except Exception as e:
             QMessageBox.critical(self, "保存失败", str(e))
             return False
+        if job is None:
+            self.statusBar().showMessage("已保存。")
+        else:
+            self._save_pool.start(_SaveTask(*job, self._save_signals))
+        self._update_title()
+        return True
+
+    def _on_save_finished(
+        self, path: Path, payload: dict[str, Any], result: os.stat_result | Exception
+    ) -> None:
+        st = None if isinstance(result, Exception) else result
+        if not self._store.finish_save(path, payload, st):
+            return
+        is_current = self._current is not None and self._current.entry.json_path == path
+        if st is not None:
+            if is_current:
+                self.statusBar().showMessage("已保存。")
+            return
+        # The edits stay with the store, so reopening the image still shows them (unsaved).
+        if is_current:
+            assert self._current is not None
+            self._current.dirty = True
+            self._update_title()
+        QMessageBox.critical(self, "保存失败", f"{path}\n{result}")
 
     def _fit_to_view(self) -> None:
-        self.canvas.fitInView(self.canvas.sceneRect(), Qt.AspectRatioMode.KeepAspectRatio)
+        self.canvas.reset_view()
 
     def _prev_image(self) -> None:
         row = self._current_image_row()
@@ -298,7 +398,7 @@ class MainWindow(QMainWindow):
         finally:
             self._sync_selection = False
 
-    def _on_canvas_selection_changed(self, det: dict[str, Any] | None) -> None:
+    def _on_canvas_selection_changed(self, det: BoxAnnotation | None) -> None:
         if self._sync_selection:
             return
         self._sync_selection = True
@@ -322,15 +422,15 @@ class MainWindow(QMainWindow):
         if not idx.isValid():
             return
         det = idx.data(Qt.ItemDataRole.UserRole)
-        if not isinstance(det, dict):
+        if not isinstance(det, BoxAnnotation):
             return
 
         self._store.delete_box(self._current, det)
         self._boxes_model.remove_detection(det)
-        self.canvas.set_boxes(self._current.detections)
+        self.canvas.remove_box(det)
         self._update_title()
 
-    def _on_box_edited(self, det: dict[str, Any]) -> None:
+    def _on_box_edited(self, det: BoxAnnotation) -> None:
         if self._current is None:
             return
         _ = det
@@ -342,12 +442,26 @@ class MainWindow(QMainWindow):
             return
         det = self._store.add_box(self._current, bbox)
         self._boxes_model.append_detection(det)
-        self.canvas.set_boxes(self._current.detections)
+        self.canvas.add_box(det)
         self.canvas.select_detection(det)
         self._update_title()
 
     def closeEvent(self, event) -> None:  # noqa: N802, ANN001
-        if not self._save_current():
+        # Let queued writes land and deliver their results before the final, synchronous save.
+        self._save_pool.waitForDone()
+        QCoreApplication.sendPostedEvents()
+        try:
+            if self._current is not None:
+                self._store.save(self._current)
+        except Exception as e:
+            QMessageBox.critical(self, "保存失败", str(e))
+            event.ignore()
+            return
+        failed = self._store.retry_failed_writes()
+        if failed:
+            names = "\n".join(str(p) for p in failed[:10])
+            more = "\n…" if len(failed) > 10 else ""
+            QMessageBox.critical(self, "保存失败", f"以下标注仍未能写入：\n{names}{more}")
             event.ignore()
             return
         super().closeEvent(event)
@@ -2,42 +2,78 @@ from __future__ import annotations
 
 from typing import Any
 
-from PySide6.QtCore import QAbstractListModel, QModelIndex, Qt
+from PySide6.QtCore import QAbstractListModel, QModelIndex, QSortFilterProxyModel, Qt
 
-from picture_annotator.gui.store import ImageEntry
+from picture_annotator.gui.store import BoxAnnotation, ImageEntry
 
 
 class ImageListModel(QAbstractListModel):
     def __init__(self, images: list[ImageEntry]) -> None:
         super().__init__()
         self._images = images
+        # data() runs per visible row on every repaint: serve it from flat per-role lists.
+        self._by_role: dict[int, list[Any]] = {
+            Qt.ItemDataRole.DisplayRole: [e.relative_path for e in images],
+            Qt.ItemDataRole.UserRole: images,
+        }
 
     def rowCount(self, parent: QModelIndex | None = None) -> int:  # noqa: N802
         return 0 if parent and parent.isValid() else len(self._images)
 
     def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole) -> Any:  # noqa: ANN401
-        if not index.isValid():
+        values = self._by_role.get(role)
+        if values is None or not index.isValid():
             return None
-        entry = self._images[index.row()]
-        if role == Qt.ItemDataRole.DisplayRole:
-            return entry.relative_path
-        if role == Qt.ItemDataRole.UserRole:
-            return entry
-        return None
+        return values[index.row()]
 
     def entry_at(self, row: int) -> ImageEntry:
         return self._images[row]
 
 
+class ImageFilterProxyModel(QSortFilterProxyModel):
+    """
+    Case-insensitive substring filter over `ImageEntry.relative_path`.
+
+    The source model is never rebuilt: changing the filter only re-evaluates rows and emits
+    row insert/remove signals, so the view keeps its selection model and current row.
+    """
+
+    def __init__(self, source: ImageListModel) -> None:
+        super().__init__()
+        self._source = source
+        self._needle = ""
+        self.setSourceModel(source)
+
+    def set_filter_text(self, text: str) -> None:
+        needle = text.strip().lower()
+        if needle == self._needle:
+            return
+        self._needle = needle
+        self.invalidateFilter()
+
+    def matches(self, entry: ImageEntry) -> bool:
+        return not self._needle or self._needle in entry.relative_path_lower
+
+    def filterAcceptsRow(self, source_row: int, source_parent: QModelIndex) -> bool:  # noqa: N802
+        return self.matches(self._source.entry_at(source_row))
+
+    def entry_at(self, row: int) -> ImageEntry:
+        return self._source.entry_at(self.mapToSource(self.index(row, 0)).row())
+
+
 class BoxListModel(QAbstractListModel):
     def __init__(self) -> None:
         super().__init__()
-        self._detections: list[dict[str, Any]] = []
+        self._detections: list[BoxAnnotation] = []
+        self._display: list[str] = []  # str(det.id) per row, kept in sync with _detections
+        self._row_by_obj: dict[BoxAnnotation, int] = {}  # by identity (`eq=False`)
 
-    def set_detections(self, detections: list[dict[str, Any]]) -> None:
+    def set_detections(self, detections: list[BoxAnnotation]) -> None:
         self.beginResetModel()
         # Copy the list so external mutations (e.g. store/session) don't desync the view/model.
         self._detections = list(detections)
+        self._display = [str(d.id) for d in self._detections]
+        self._row_by_obj = {d: row for row, d in enumerate(self._detections)}
         self.endResetModel()
 
     def rowCount(self, parent: QModelIndex | None = None) -> int:  # noqa: N802
@@ -46,33 +82,38 @@ class BoxListModel(QAbstractListModel):
     def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole) -> Any:  # noqa: ANN401
         if not index.isValid():
             return None
-        det = self._detections[index.row()]
         if role == Qt.ItemDataRole.DisplayRole:
-            det_id = det.get("id")
-            return str(det_id) if isinstance(det_id, int) else "?"
+            return self._display[index.row()]
         if role == Qt.ItemDataRole.UserRole:
-            return det
+            return self._detections[index.row()]
         return None
 
-    def detection_at(self, row: int) -> dict[str, Any]:
+    def detection_at(self, row: int) -> BoxAnnotation:
         return self._detections[row]
 
-    def index_of(self, det: dict[str, Any]) -> int | None:
-        try:
-            return self._detections.index(det)
-        except ValueError:
-            return None
+    def index_of(self, det: BoxAnnotation) -> int | None:
+        return self._row_by_obj.get(det)
 
-    def append_detection(self, det: dict[str, Any]) -> None:
+    def append_detection(self, det: BoxAnnotation) -> None:
         row = len(self._detections)
         self.beginInsertRows(QModelIndex(), row, row)
         self._detections.append(det)
+        self._display.append(str(det.id))
+        self._row_by_obj[det] = row
         self.endInsertRows()
 
-    def remove_detection(self, det: dict[str, Any]) -> None:
+    def remove_detection(self, det: BoxAnnotation) -> None:
+        """
+        Removes `det`'s row. The lookup is O(1), but every later row shifts up, so their cached
+        rows are rewritten: O(N - row) per removal.
+        """
         row = self.index_of(det)
         if row is None:
             return
         self.beginRemoveRows(QModelIndex(), row, row)
         self._detections.pop(row)
+        self._display.pop(row)
+        del self._row_by_obj[det]
+        for r in range(row, len(self._detections)):  # rows after the removed one shift up
+            self._row_by_obj[self._detections[r]] = r
         self.endRemoveRows()
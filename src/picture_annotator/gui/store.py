@@ -1,25 +1,105 @@
 from __future__ import annotations
 
 import json
+import math
+import os
+from collections import OrderedDict
 from dataclasses import dataclass, field
+from itertools import chain
+from operator import attrgetter
 from pathlib import Path
 from typing import Any
 
+import numpy as np
+
+try:
+    import orjson  # type: ignore[import-not-found]
+except ModuleNotFoundError:  # pragma: no cover
+    orjson = None  # type: ignore[assignment]
+
 from picture_annotator.config import AppConfig
 from picture_annotator.image_utils import get_image_size
-from picture_annotator.paths import iter_image_files, map_output_path
+from picture_annotator.output import dumps_json
+from picture_annotator.paths import iter_image_files
 from picture_annotator.project import resolve_from
 
+# Sidecar in the output dir caching image sizes across sessions. Deliberately not `*.json`, so tools
+# globbing the output dir for annotation files don't pick it up.
+SIZE_CACHE_NAME = ".image_sizes.cache"
+
+# JSON value types float() would parse but `load` rejects as coordinates/scores.
+_TEXT_TYPES = frozenset((str, bytes))
+
+# Parsed annotation payloads kept in memory, so Q/E back-and-forth skips re-reading the JSON.
+PAYLOAD_CACHE_SIZE = 16
+
+
+def _loads(data: bytes) -> Any:  # noqa: ANN401
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass  # e.g. NaN/Infinity, which orjson rejects but `json.dump` writes by default
+    return json.loads(data.decode("utf-8"))
+
+
+def _dumps(payload: dict[str, Any]) -> bytes:
+    """
+    `dumps_json`, except that payloads with a NaN/Infinity box value go through the stdlib: orjson
+    would write them as `null`, which `load` then drops, while `NaN` reads back as it was.
+    """
+    detections = payload.get("detections") or ()
+    if all(math.isfinite(v) for det in detections for v in (*det["bbox"], det["score"])):
+        return dumps_json(payload)
+    return (json.dumps(payload, indent=2, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def _payload_image_size(payload: Any) -> tuple[int, int] | None:  # noqa: ANN401
+    """
+    `(width, height)` from a payload's `image` block when both are positive ints, else None.
+    """
+    image = payload.get("image") if isinstance(payload, dict) else None
+    if not isinstance(image, dict):
+        return None
+    w = image.get("width")
+    h = image.get("height")
+    if type(w) is int and type(h) is int and w > 0 and h > 0:
+        return w, h
+    return None
+
 
 def _clamp(value: float, low: float, high: float) -> float:
     return max(low, min(value, high))
 
 
+def _clamp_bboxes(bboxes: np.ndarray, *, width: int, height: int) -> np.ndarray:
+    """
+    Vectorized `AnnotationStore._clamp_bbox` over an `(N, 4)` xyxy array (returns a new array).
+    """
+    w = float(width)
+    h = float(height)
+    xmin = np.clip(bboxes[:, 0], 0.0, max(w - 1.0, 0.0))
+    ymin = np.clip(bboxes[:, 1], 0.0, max(h - 1.0, 0.0))
+    xmax = np.clip(bboxes[:, 2], min(1.0, w), w)
+    ymax = np.clip(bboxes[:, 3], min(1.0, h), h)
+
+    # Enforce the 1px minimum size, shifting back inside the image at the far edge.
+    thin = xmax - xmin < 1.0
+    xmax = np.where(thin, np.minimum(w, xmin + 1.0), xmax)
+    xmin = np.where(thin, np.maximum(0.0, xmax - 1.0), xmin)
+    thin = ymax - ymin < 1.0
+    ymax = np.where(thin, np.minimum(h, ymin + 1.0), ymax)
+    ymin = np.where(thin, np.maximum(0.0, ymax - 1.0), ymin)
+
+    return np.column_stack((xmin, ymin, xmax, ymax))
+
+
 @dataclass(frozen=True, slots=True)
 class ImageEntry:
     image_path: Path
     relative_path: str
     json_path: Path
+    relative_path_lower: str  # precomputed for the (per-keystroke) search filter
 
 
 @dataclass(slots=True)
@@ -30,16 +110,66 @@ class LoadReport:
     clamped_count: int = 0
 
 
+@dataclass(slots=True, eq=False)
+class BoxAnnotation:
+    """
+    Editable detection record. The canvas mutates the bbox fields in place on every drag event, so
+    they are plain slotted floats rather than a dict + list. `extra` keeps any unknown JSON keys so
+    save round-trips them. Compared by identity (`eq=False`), like the dicts it replaces.
+    """
+
+    id: int
+    xmin: float
+    ymin: float
+    xmax: float
+    ymax: float
+    score: float
+    extra: dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def bbox(self) -> tuple[float, float, float, float]:
+        return (self.xmin, self.ymin, self.xmax, self.ymax)
+
+    def set_bbox(self, xmin: float, ymin: float, xmax: float, ymax: float) -> None:
+        self.xmin = xmin
+        self.ymin = ymin
+        self.xmax = xmax
+        self.ymax = ymax
+
+    def to_json(self) -> dict[str, Any]:
+        out: dict[str, Any] = {
+            "id": self.id,
+            "bbox": [self.xmin, self.ymin, self.xmax, self.ymax],
+            "score": self.score,
+        }
+        out.update(self.extra)
+        return out
+
+
+_XYXY = attrgetter("xmin", "ymin", "xmax", "ymax")
+
+
 @dataclass(slots=True)
 class AnnotationSession:
     entry: ImageEntry
     width: int
     height: int
     payload: dict[str, Any]
-    detections: list[dict[str, Any]]
+    detections: list[BoxAnnotation]
     next_id: int
     dirty: bool = False
 
+    def bbox_array(self) -> np.ndarray:
+        """
+        `(N, 4)` float64 xyxy snapshot of all boxes for vectorized passes (filled in C, no
+        per-box Python list).
+        """
+        n = len(self.detections)
+        flat = np.fromiter(
+            chain.from_iterable(map(_XYXY, self.detections)), dtype=np.float64, count=4 * n
+        )
+        return flat.reshape(n, 4)
+
 
 class AnnotationStore:
     def __init__(self, *, app_root: Path, config: AppConfig) -> None:
@@ -49,75 +179,122 @@ class AnnotationStore:
         self.input_dir = resolve_from(app_root, config.input.dir)
         self.output_dir = resolve_from(app_root, config.output.dir)
 
+        # relative_path -> (mtime_ns, file size, width, height)
+        self._size_cache_path = self.output_dir / SIZE_CACHE_NAME
+        self._size_cache = self._read_size_cache()
+        self._size_cache_dirty = False
+
+        # json_path -> (mtime_ns, file size, payload); validated against a fresh stat on every hit.
+        self._payload_cache: OrderedDict[Path, tuple[int, int, dict[str, Any]]] = OrderedDict()
+
+        # json_path -> newest payload handed out by `begin_save` and not yet confirmed on disk
+        # (still queued, or its write failed: those paths are also in `_failed_writes`).
+        self._pending_writes: dict[Path, dict[str, Any]] = {}
+        self._failed_writes: set[Path] = set()
+
     def list_images(self) -> list[ImageEntry]:
         images = iter_image_files(
             input_dir=self.input_dir,
             recursive=self.config.input.recursive,
             extensions=self.config.input.extensions,
         )
+        # Every path is `<input_dir><sep><rel>` with a non-empty suffix (see `iter_image_files`), so
+        # plain string slicing gives the same results as `relative_to` / `map_output_path` without
+        # per-file PurePath parsing.
+        prefix_len = len(os.path.join(os.fspath(self.input_dir), ""))
         entries: list[ImageEntry] = []
         for image_path in images:
-            rel = image_path.relative_to(self.input_dir)
-            rel_str = str(rel).replace("\\", "/")
-            json_path = map_output_path(
-                output_dir=self.output_dir,
-                input_dir=self.input_dir,
-                image_path=image_path,
-                suffix=".json",
+            rel_str = os.fspath(image_path)[prefix_len:].replace(os.sep, "/")
+            json_path = self.output_dir / (rel_str[: rel_str.rfind(".")] + ".json")
+            rel_lower = rel_str.lower()
+            if rel_lower == rel_str:  # usual case: share one string instead of holding a copy
+                rel_lower = rel_str
+            entries.append(
+                ImageEntry(
+                    image_path=image_path,
+                    relative_path=rel_str,
+                    json_path=json_path,
+                    relative_path_lower=rel_lower,
+                )
             )
-            entries.append(ImageEntry(image_path=image_path, relative_path=rel_str, json_path=json_path))
         return entries
 
     def load(self, entry: ImageEntry) -> tuple[AnnotationSession, LoadReport]:
-        w, h = get_image_size(entry.image_path)
         report = LoadReport()
 
-        if not entry.json_path.exists():
-            payload = self._new_payload(entry=entry, width=w, height=h)
-            entry.json_path.parent.mkdir(parents=True, exist_ok=True)
-            self._write_json_atomic(entry.json_path, payload)
-            report.created_new_json = True
-        else:
+        # A save still in flight (or one that failed) is newer than whatever the file holds.
+        payload: Any = self._pending_writes.get(entry.json_path)
+        json_exists = payload is not None or entry.json_path.exists()
+        if json_exists and payload is None:
             try:
-                payload = json.loads(entry.json_path.read_text(encoding="utf-8"))
+                payload = self._read_payload(entry.json_path)
             except Exception:
-                payload = self._new_payload(entry=entry, width=w, height=h)
                 report.json_parse_failed = True
 
+        # Saved JSON records the image size; only read the image header when it doesn't.
+        size = _payload_image_size(payload)
+        w, h = size if size is not None else self._image_size(entry)
+
+        if not json_exists:
+            payload = self._new_payload(entry=entry, width=w, height=h)
+            self._write_json_atomic(entry.json_path, payload)
+            report.created_new_json = True
+        elif report.json_parse_failed:
+            payload = self._new_payload(entry=entry, width=w, height=h)
+
         detections_raw = payload.get("detections", [])
         if not isinstance(detections_raw, list):
             detections_raw = []
 
-        detections: list[dict[str, Any]] = []
+        # Shape/type checks per item, then one vectorized pass for geometry validation + clamping.
+        # `order` keeps every checked id in file order with its row in `bboxes` (-1: already
+        # invalid), so dropped ids are reported in the order they appear in the file.
+        order: list[tuple[int, int]] = []
+        kept: list[tuple[float, dict[str, Any]]] = []
+        bboxes: list[tuple[float, float, float, float]] = []
         for det in detections_raw:
             if not isinstance(det, dict):
                 continue
             det_id = det.get("id")
-            bbox = det.get("bbox")
-            score = det.get("score")
             if not isinstance(det_id, int):
                 continue
-            if not (isinstance(bbox, list) and len(bbox) == 4 and all(isinstance(x, (int, float)) for x in bbox)):
-                report.dropped_invalid.append(det_id)
+            bbox = det.get("bbox")
+            score = det.get("score")
+            if not isinstance(bbox, list):
+                order.append((det_id, -1))
                 continue
-            if not isinstance(score, (int, float)):
-                report.dropped_invalid.append(det_id)
+            # One try block converts all five values; float() alone would also accept numeric
+            # strings, which were never valid coordinates or scores.
+            try:
+                xmin, ymin, xmax, ymax = bbox
+                if not _TEXT_TYPES.isdisjoint(map(type, (xmin, ymin, xmax, ymax, score))):
+                    raise TypeError("bbox/score must be numbers")
+                bbox = (float(xmin), float(ymin), float(xmax), float(ymax))
+                score = float(score)  # type: ignore[arg-type]
+            except (TypeError, ValueError):
+                order.append((det_id, -1))
                 continue
-            xmin, ymin, xmax, ymax = (float(bbox[0]), float(bbox[1]), float(bbox[2]), float(bbox[3]))
-            if xmin >= xmax or ymin >= ymax:
+            extra = {k: v for k, v in det.items() if k not in ("id", "bbox", "score")}
+            order.append((det_id, len(bboxes)))
+            kept.append((score, extra))
+            bboxes.append(bbox)
+
+        arr = np.asarray(bboxes, dtype=np.float64).reshape(-1, 4)
+        valid = ~((arr[:, 0] >= arr[:, 2]) | (arr[:, 1] >= arr[:, 3]))
+        clamped = _clamp_bboxes(arr, width=w, height=h)
+        report.clamped_count = int(np.count_nonzero((clamped != arr).any(axis=1) & valid))
+
+        valid_rows = valid.tolist()
+        clamped_rows = clamped.tolist()
+        detections: list[BoxAnnotation] = []
+        for det_id, row in order:
+            if row < 0 or not valid_rows[row]:
                 report.dropped_invalid.append(det_id)
                 continue
+            score, extra = kept[row]
+            detections.append(BoxAnnotation(det_id, *clamped_rows[row], score=score, extra=extra))
 
-            clamped = self._clamp_bbox((xmin, ymin, xmax, ymax), width=w, height=h)
-            if clamped != (xmin, ymin, xmax, ymax):
-                report.clamped_count += 1
-                det["bbox"] = [clamped[0], clamped[1], clamped[2], clamped[3]]
-            detections.append(det)
-
-        if report.dropped_invalid or report.json_parse_failed:
-            payload["detections"] = detections
-
-        max_id = max((d.get("id", -1) for d in detections if isinstance(d.get("id"), int)), default=-1)
+        max_id = max((d.id for d in detections), default=-1)
 
         session = AnnotationSession(
             entry=entry,
@@ -126,41 +303,140 @@ class AnnotationStore:
             payload=payload,
             detections=detections,
             next_id=int(max_id) + 1,
-            dirty=bool(report.dropped_invalid or report.json_parse_failed or report.clamped_count),
+            dirty=bool(
+                report.dropped_invalid
+                or report.json_parse_failed
+                or report.clamped_count
+                or entry.json_path in self._failed_writes
+            ),
         )
         return session, report
 
     def save(self, session: AnnotationSession) -> None:
-        for det in session.detections:
-            bbox = det.get("bbox")
-            if not (isinstance(bbox, list) and len(bbox) == 4 and all(isinstance(x, (int, float)) for x in bbox)):
-                continue
-            xmin, ymin, xmax, ymax = (float(bbox[0]), float(bbox[1]), float(bbox[2]), float(bbox[3]))
-            clamped = self._clamp_bbox((xmin, ymin, xmax, ymax), width=session.width, height=session.height)
-            if clamped != (xmin, ymin, xmax, ymax):
-                det["bbox"] = [clamped[0], clamped[1], clamped[2], clamped[3]]
-
-        session.payload["detections"] = session.detections
-
-        session.entry.json_path.parent.mkdir(parents=True, exist_ok=True)
-        self._write_json_atomic(session.entry.json_path, session.payload)
+        job = self.begin_save(session)
+        if job is None:
+            return
+        path, payload = job
+        try:
+            st = write_json_atomic(path, payload)
+        except Exception:
+            self.finish_save(path, payload, None)
+            session.dirty = True
+            raise
+        self.finish_save(path, payload, st)
+
+    def begin_save(self, session: AnnotationSession) -> tuple[Path, dict[str, Any]] | None:
+        """
+        Finalize the session's payload for writing and return `(json_path, payload)`, or None when
+        there is nothing to save. The caller writes it with `write_json_atomic` (any thread) and
+        reports back through `finish_save` (this store's thread); until then `load` serves the
+        pending payload instead of the file.
+        """
+        self._flush_size_cache()
+        if not session.dirty:
+            # Nothing changed since load/last save (load-time clamps/drops mark the session dirty).
+            return None
+        if session.detections:
+            arr = session.bbox_array()
+            clamped = _clamp_bboxes(arr, width=session.width, height=session.height)
+            for i in np.flatnonzero((clamped != arr).any(axis=1)).tolist():
+                session.detections[i].set_bbox(*clamped[i].tolist())
+
+        # New dict rather than in-place: the old one may be shared with the payload cache, which
+        # must keep matching the file on disk if the write below fails.
+        detections = [det.to_json() for det in session.detections]
+        session.payload = {**session.payload, "detections": detections}
         session.dirty = False
+        self._pending_writes[session.entry.json_path] = session.payload
+        return session.entry.json_path, session.payload
+
+    def finish_save(
+        self, path: Path, payload: dict[str, Any], st: os.stat_result | None
+    ) -> bool:
+        """
+        Record the outcome of writing a `begin_save` payload (`st` is None when the write failed).
+        Returns False when a newer save of the same file has superseded it.
+        """
+        if self._pending_writes.get(path) is not payload:
+            return False  # superseded by a newer save of the same file, which decides the outcome
+        if st is None:
+            self._failed_writes.add(path)
+            return True
+        del self._pending_writes[path]
+        self._failed_writes.discard(path)
+        # What we just wrote is what a re-read would parse to.
+        self._remember_payload(path, payload, st.st_mtime_ns, st.st_size)
+        return True
+
+    def retry_failed_writes(self) -> list[Path]:
+        """
+        Synchronously retry writes that failed earlier; returns the paths that still fail.
+        """
+        for path in sorted(self._failed_writes):
+            payload = self._pending_writes[path]
+            try:
+                st = write_json_atomic(path, payload)
+            except Exception:
+                continue
+            self.finish_save(path, payload, st)
+        return sorted(self._failed_writes)
 
-    def add_box(self, session: AnnotationSession, bbox: tuple[float, float, float, float]) -> dict[str, Any]:
-        xmin, ymin, xmax, ymax = self._clamp_bbox(bbox, width=session.width, height=session.height)
-        det = {"id": session.next_id, "bbox": [xmin, ymin, xmax, ymax], "score": 1.0}
+    def add_box(self, session: AnnotationSession, bbox: tuple[float, float, float, float]) -> BoxAnnotation:
+        clamped = self._clamp_bbox(bbox, width=session.width, height=session.height)
+        det = BoxAnnotation(session.next_id, *clamped, score=1.0)
         session.next_id += 1
         session.detections.append(det)
         session.dirty = True
         return det
 
-    def delete_box(self, session: AnnotationSession, det: dict[str, Any]) -> None:
+    def delete_box(self, session: AnnotationSession, det: BoxAnnotation) -> None:
         try:
             session.detections.remove(det)
         except ValueError:
             return
         session.dirty = True
 
+    def _image_size(self, entry: ImageEntry) -> tuple[int, int]:
+        """
+        Image (width, height); reuses the cached header parse while the file's mtime/size match.
+        """
+        st = entry.image_path.stat()
+        cached = self._size_cache.get(entry.relative_path)
+        if cached is not None and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+            return cached[2], cached[3]
+        w, h = get_image_size(entry.image_path)
+        self._size_cache[entry.relative_path] = (st.st_mtime_ns, st.st_size, w, h)
+        self._size_cache_dirty = True
+        return w, h
+
+    def _read_size_cache(self) -> dict[str, tuple[int, int, int, int]]:
+        try:
+            raw = json.loads(self._size_cache_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(raw, dict):
+            return {}
+        cache: dict[str, tuple[int, int, int, int]] = {}
+        for rel, value in raw.items():
+            if isinstance(value, list) and len(value) == 4 and all(type(x) is int for x in value):
+                cache[rel] = (value[0], value[1], value[2], value[3])
+        return cache
+
+    def _flush_size_cache(self) -> None:
+        """
+        Best-effort persist of the size cache; a failed write only costs re-reading headers.
+        """
+        if not self._size_cache_dirty:
+            return
+        try:
+            self._size_cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self._size_cache_path.with_name(self._size_cache_path.name + ".tmp")
+            tmp.write_text(json.dumps(self._size_cache, separators=(",", ":")), encoding="utf-8")
+            tmp.replace(self._size_cache_path)
+        except OSError:
+            return
+        self._size_cache_dirty = False
+
     def _new_payload(self, *, entry: ImageEntry, width: int, height: int) -> dict[str, Any]:
         return {
             "format_version": "1.0",
@@ -195,7 +471,47 @@ class AnnotationStore:
 
         return (xmin, ymin, xmax, ymax)
 
+    def _read_payload(self, path: Path) -> Any:  # noqa: ANN401
+        st = path.stat()
+        cached = self._payload_cache.get(path)
+        if cached is not None and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+            self._payload_cache.move_to_end(path)
+            return cached[2]
+        payload = _loads(path.read_bytes())
+        if isinstance(payload, dict):
+            self._remember_payload(path, payload, st.st_mtime_ns, st.st_size)
+        return payload
+
+    def _remember_payload(
+        self, path: Path, payload: dict[str, Any], mtime_ns: int, size: int
+    ) -> None:
+        self._payload_cache[path] = (mtime_ns, size, payload)
+        self._payload_cache.move_to_end(path)
+        while len(self._payload_cache) > PAYLOAD_CACHE_SIZE:
+            self._payload_cache.popitem(last=False)
+
     def _write_json_atomic(self, path: Path, payload: dict[str, Any]) -> None:
-        tmp = path.with_suffix(path.suffix + ".tmp")
-        tmp.write_text(json.dumps(payload, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
-        tmp.replace(path)
+        st = write_json_atomic(path, payload)
+        # What we just wrote is what a re-read would parse to.
+        self._remember_payload(path, payload, st.st_mtime_ns, st.st_size)
+
+
+def write_json_atomic(path: Path, payload: dict[str, Any]) -> os.stat_result:
+    """
+    Write `payload` to `path` via a temp file + rename and return the new file's stat. Touches no
+    store state, so it is safe to run on a worker thread.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    data = memoryview(_dumps(payload))
+    # Unbuffered write + fsync so the rename never exposes a partially written file after a
+    # crash/power loss. O_BINARY: no newline translation on Windows.
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0), 0o666)
+    try:
+        while data:
+            data = data[os.write(fd, data) :]
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+    os.replace(tmp, path)
+    return path.stat()
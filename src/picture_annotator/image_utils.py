@@ -20,21 +20,21 @@ def get_image_size(path: Path) -> tuple[int, int]:
     return int(w), int(h)
 
 
+# JPEG headers (incl. typical EXIF/ICC segments) are read in chunks of this size rather than with
+# one tiny `read()` per marker byte; large segments are skipped with a seek.
+_JPEG_CHUNK = 64 * 1024
+
+
 def _get_image_size_without_pillow(path: Path) -> tuple[int, int]:
     with path.open("rb") as f:
         header = f.read(32)
 
     # PNG signature + IHDR width/height
     if header.startswith(b"\x89PNG\r\n\x1a\n") and b"IHDR" in header[:24]:
-        # PNG: signature(8) length(4) type(4) data(13...)
-        with path.open("rb") as f:
-            f.read(8)
-            length = struct.unpack(">I", f.read(4))[0]
-            ctype = f.read(4)
-            if ctype != b"IHDR":
-                raise ValueError(f"Unsupported PNG layout: {path}")
-            data = f.read(length)
-        w, h = struct.unpack(">II", data[:8])
+        # PNG: signature(8) length(4) type(4) data(13...); IHDR data starts with width/height.
+        if header[12:16] != b"IHDR":
+            raise ValueError(f"Unsupported PNG layout: {path}")
+        w, h = struct.unpack_from(">II", header, 16)
         return int(w), int(h)
 
     # JPEG: parse markers until SOFn
@@ -46,19 +46,34 @@ def _get_image_size_without_pillow(path: Path) -> tuple[int, int]:
 
 def _get_jpeg_size(path: Path) -> tuple[int, int]:
     with path.open("rb") as f:
-        if f.read(2) != b"\xff\xd8":
+        buf = f.read(_JPEG_CHUNK)
+        base = 0  # file offset of buf[0]
+        pos = 0  # file offset of the next byte to parse
+
+        def take(n: int) -> bytes:
+            nonlocal buf, base, pos
+            start = pos - base
+            if start < 0 or start + n > len(buf):
+                f.seek(pos)
+                buf = f.read(max(n, _JPEG_CHUNK))
+                base = pos
+                start = 0
+            data = buf[start : start + n]
+            pos += len(data)
+            return data
+
+        if take(2) != b"\xff\xd8":
             raise ValueError(f"Not a JPEG: {path}")
         while True:
-            marker_prefix = f.read(1)
-            if marker_prefix != b"\xff":
+            if take(1) != b"\xff":
                 raise ValueError(f"Invalid JPEG marker: {path}")
-            marker = f.read(1)
+            marker = take(1)
             # Skip fill bytes
             while marker == b"\xff":
-                marker = f.read(1)
+                marker = take(1)
             if marker in {b"\xd8", b"\xd9"}:
                 continue
-            length_bytes = f.read(2)
+            length_bytes = take(2)
             if len(length_bytes) != 2:
                 raise ValueError(f"Truncated JPEG: {path}")
             (segment_length,) = struct.unpack(">H", length_bytes)
@@ -66,11 +81,10 @@ def _get_jpeg_size(path: Path) -> tuple[int, int]:
                 raise ValueError(f"Invalid JPEG segment length: {path}")
             if b"\xc0" <= marker <= b"\xcf" and marker not in {b"\xc4", b"\xc8", b"\xcc"}:
                 # SOF segment: [precision(1), height(2), width(2), ...]
-                data = f.read(5)
+                data = take(5)
                 if len(data) != 5:
                     raise ValueError(f"Truncated JPEG SOF: {path}")
                 _, h, w = struct.unpack(">BHH", data)
                 return int(w), int(h)
             # Skip rest of the segment
-            f.seek(segment_length - 2, 1)
-
+            pos += segment_length - 2
@@ -1,12 +1,53 @@
 from __future__ import annotations
 
 import json
-from dataclasses import asdict
+import threading
+from collections.abc import Iterator
 from pathlib import Path
-from typing import Any
+from typing import Any, BinaryIO
+
+try:
+    import orjson  # type: ignore[import-not-found]
+except ModuleNotFoundError:  # pragma: no cover
+    orjson = None  # type: ignore[assignment]
 
 from picture_annotator.detectors.base import Detection
 
+_FORMAT_VERSION = "1.0"
+
+# Single manifest written under `output.dir` when `output.mode = "ndjson"`.
+NDJSON_MANIFEST_NAME = "detections.ndjson"
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE | orjson.OPT_SERIALIZE_NUMPY
+    _ORJSON_LINE_OPTIONS = orjson.OPT_APPEND_NEWLINE | orjson.OPT_SERIALIZE_NUMPY
+
+
+def dumps_json(payload: dict[str, Any]) -> bytes:
+    """
+    2-space indented UTF-8 JSON plus trailing newline (same layout as
+    `json.dumps(indent=2, ensure_ascii=False)`), serialized natively by orjson when available.
+    With orjson, NumPy scalars/arrays in `extra` are accepted as well.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(payload, option=_ORJSON_OPTIONS)
+        except TypeError:  # e.g. ints beyond 64 bits: let the stdlib handle them
+            pass
+    return (json.dumps(payload, indent=2, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def dumps_json_line(payload: dict[str, Any]) -> bytes:
+    """
+    Compact single-line UTF-8 JSON plus newline (one NDJSON record).
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(payload, option=_ORJSON_LINE_OPTIONS)
+        except TypeError:
+            pass
+    return (json.dumps(payload, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+
 
 def write_per_image_json(
     *,
@@ -18,8 +59,62 @@ def write_per_image_json(
     detections: list[Detection],
     extra: dict[str, Any] | None = None,
 ) -> None:
+    payload = build_image_payload(
+        file_name=file_name,
+        relative_path=relative_path,
+        width=width,
+        height=height,
+        detections=detections,
+        extra=extra,
+    )
+    data = dumps_json(payload)
+    try:
+        output_path.write_bytes(data)
+    except FileNotFoundError:
+        # Only the first image of each output directory pays for the mkdir.
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        output_path.write_bytes(data)
+
+
+def read_per_image_json(path: Path) -> dict[str, Any] | None:
+    """
+    Payload of a per-image JSON, or None if the file does not exist.
+    """
+    try:
+        data = path.read_bytes()
+    except FileNotFoundError:
+        return None
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+def detections_from_payload(payload: dict[str, Any]) -> list[Detection]:
+    """
+    `Detection`s of an output payload (per-image JSON or manifest record).
+    """
+    return [
+        Detection(
+            id=int(det["id"]),
+            bbox=tuple(float(v) for v in det["bbox"]),  # type: ignore[arg-type]
+            score=float(det["score"]),
+        )
+        for det in payload.get("detections") or []
+    ]
+
+
+def build_image_payload(
+    *,
+    file_name: str,
+    relative_path: str,
+    width: int,
+    height: int,
+    detections: list[Detection],
+    extra: dict[str, Any] | None = None,
+) -> dict[str, Any]:
+    """
+    One image's output payload (see docs/OUTPUT_SCHEMA.md), as written per image or per line.
+    """
     payload: dict[str, Any] = {
-        "format_version": "1.0",
+        "format_version": _FORMAT_VERSION,
         "image": {
             "file_name": file_name,
             "relative_path": relative_path,
@@ -27,17 +122,78 @@ def write_per_image_json(
             "height": int(height),
         },
         "detections": [
-            {"id": det.id, "bbox": list(det.bbox), "score": float(det.score)} for det in detections
+            {"id": det.id, "bbox": list(det.bbox), "score": float(det.score)}
+            for det in detections
         ],
     }
 
     if extra:
         payload["extra"] = extra
+    return payload
+
+
+class NdjsonManifestWriter:
+    """
+    Appends one payload per line to a single manifest file; `write` may be called from several
+    threads. Use as a context manager so buffered lines are flushed on exit.
+    """
+
+    def __init__(self, path: Path, *, append: bool) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._file: BinaryIO = path.open("ab" if append else "wb", buffering=1 << 20)
+        # A run that died mid-write can leave a partial last line; start on a fresh one.
+        if append and self._file.tell() > 0 and not _ends_with_newline(path):
+            self._file.write(b"\n")
+
+    def write(self, payload: dict[str, Any]) -> None:
+        line = dumps_json_line(payload)
+        with self._lock:
+            self._file.write(line)
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> NdjsonManifestWriter:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+
+def iter_manifest_records(path: Path) -> Iterator[tuple[str, dict[str, Any]]]:
+    """
+    `(image.relative_path, payload)` of every complete record in an NDJSON manifest, in file order
+    (nothing if the manifest does not exist).
+    """
+    try:
+        data = path.read_bytes()
+    except FileNotFoundError:
+        return
+    loads = orjson.loads if orjson is not None else json.loads
+    for line in data.splitlines():
+        try:
+            payload = loads(line)
+            rel = payload["image"]["relative_path"]
+        except (ValueError, TypeError, KeyError):
+            continue  # blank or truncated line
+        if isinstance(rel, str):
+            yield rel, payload
+
+
+def read_manifest_relative_paths(path: Path) -> set[str]:
+    """
+    `image.relative_path` of every complete record in an NDJSON manifest (empty if missing).
+    """
+    return {rel for rel, _ in iter_manifest_records(path)}
+
 
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    output_path.write_text(json.dumps(payload, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+def _ends_with_newline(path: Path) -> bool:
+    with path.open("rb") as f:
+        f.seek(-1, 2)
+        return f.read(1) == b"\n"
 
 
 def _debug_detection(det: Detection) -> dict[str, Any]:
-    return asdict(det)
+    return {"id": det.id, "bbox": det.bbox, "score": det.score}
 
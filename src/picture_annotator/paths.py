@@ -1,24 +1,44 @@
 from __future__ import annotations
 
+import os
+from collections.abc import Iterator
 from pathlib import Path
 
 
 def iter_image_files(*, input_dir: Path, recursive: bool, extensions: tuple[str, ...]) -> list[Path]:
-    exts = tuple(x.lower() for x in extensions)
-    if recursive:
-        candidates = input_dir.rglob("*")
-    else:
-        candidates = input_dir.glob("*")
-
-    images: list[Path] = []
-    for p in candidates:
-        if not p.is_file():
-            continue
-        if p.suffix.lower() in exts:
-            images.append(p)
-
-    images.sort()
-    return images
+    exts = frozenset(x.lower() for x in extensions)
+    found = list(_scan_image_files(os.fspath(input_dir), exts, recursive))
+    # Sort the strings by their (case-normalized) components: the same order as sorting the
+    # `Path`s, without building each path's comparison parts.
+    found.sort(key=_path_sort_key)
+    return [Path(p) for p in found]
+
+
+def _path_sort_key(path: str) -> list[str]:
+    return os.path.normcase(path).split(os.sep)
+
+
+def _scan_image_files(directory: str, exts: frozenset[str], recursive: bool) -> Iterator[str]:
+    """
+    `os.scandir` walk yielding image file paths; same selection as `glob`/`rglob("*")` +
+    `is_file()` + `suffix.lower() in exts`, but the suffix is checked on the entry name first so
+    only candidates pay for a `stat`, and subdirectory checks come from the scandir cache.
+    Like `rglob`, symlinked directories are not followed, and unreadable or missing directories
+    (including a missing `input_dir`) yield nothing instead of raising.
+    """
+    try:
+        with os.scandir(directory) as it:
+            entries = list(it)
+    except (PermissionError, FileNotFoundError, NotADirectoryError):
+        return
+    for entry in entries:
+        name = entry.name
+        dot = name.rfind(".")
+        # Same rule as `PurePath.suffix`: no suffix for leading-dot names or a trailing dot.
+        if 0 < dot < len(name) - 1 and name[dot:].lower() in exts and entry.is_file():
+            yield entry.path
+        elif recursive and entry.is_dir(follow_symlinks=False):
+            yield from _scan_image_files(entry.path, exts, recursive)
 
 
 def map_output_path(*, output_dir: Path, input_dir: Path, image_path: Path, suffix: str) -> Path:
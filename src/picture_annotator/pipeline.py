@@ -1,18 +1,38 @@
 from __future__ import annotations
 
 import logging
+import os
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import nullcontext
 from pathlib import Path
+from typing import Any
 
 from picture_annotator.config import AppConfig
+from picture_annotator.detectors.base import ImageDetections
 from picture_annotator.detectors.yolo_sahi import YoloSahiPersonDetector
-from picture_annotator.image_utils import get_image_size
-from picture_annotator.output import write_per_image_json
-from picture_annotator.paths import iter_image_files, map_output_path
+from picture_annotator.output import (
+    NDJSON_MANIFEST_NAME,
+    NdjsonManifestWriter,
+    build_image_payload,
+    detections_from_payload,
+    iter_manifest_records,
+    read_manifest_relative_paths,
+    read_per_image_json,
+    write_per_image_json,
+)
+from picture_annotator.paths import iter_image_files
 from picture_annotator.project import find_project_root, resolve_from
 from picture_annotator.visualize import save_visualization
 
 LOGGER = logging.getLogger(__name__)
 
+# JSON + visualization writers running alongside detection (Pillow encoding releases the GIL).
+OUTPUT_WORKERS = min(4, os.cpu_count() or 1)
+# Completed-detection backlog allowed per writer before the detection loop waits for them.
+OUTPUT_BACKLOG_PER_WORKER = 4
+
 
 def run_pipeline(*, config: AppConfig, config_path: Path) -> None:
     project_root = find_project_root(config_path)
@@ -38,45 +58,195 @@ def run_pipeline(*, config: AppConfig, config_path: Path) -> None:
     except ModuleNotFoundError:
         tqdm = None  # type: ignore[assignment]
 
-    iterator = tqdm(images, desc="detect") if tqdm else images
+    ndjson = config.output.mode == "ndjson"
+    manifest_path = output_dir / NDJSON_MANIFEST_NAME
+    targets = _output_targets(
+        images=images,
+        input_dir=input_dir,
+        output_dir=output_dir,
+        vis_dir=vis_dir,
+        vis_suffix=f".{config.visualization.format}",
+    )
+    # Existing outputs are filtered out up front so only images that need detection reach the
+    # detector, which batches them by `model.batch`.
+    if config.output.overwrite:
+        pending = list(targets)
+    elif ndjson:
+        done = read_manifest_relative_paths(manifest_path)
+        pending = [target for target in targets if target[1] not in done]
+    else:
+        pending = [target for target in targets if not target[2].exists()]
+    if len(pending) < len(images):
+        LOGGER.info("Skipping %d images with existing output", len(images) - len(pending))
+
+    results = zip(pending, detector.detect_stream(t[0] for t in pending), strict=True)
+    iterator = tqdm(results, total=len(pending), desc="detect") if tqdm else results
+
+    manifest_writer = (
+        NdjsonManifestWriter(manifest_path, append=not config.output.overwrite)
+        if ndjson
+        else nullcontext(None)
+    )
+    # Outputs are written on a small pool so the detector never waits on disk or PNG encoding.
+    # The pool is shut down (all writes done) before the manifest is closed.
+    with manifest_writer as manifest, ThreadPoolExecutor(
+        max_workers=OUTPUT_WORKERS, thread_name_prefix="output"
+    ) as pool:
+        in_flight: deque[Future[None]] = deque()
+        for (image_path, relative_path, out_json_path, out_vis_path), result in iterator:
+            in_flight.append(
+                pool.submit(
+                    _write_outputs,
+                    image_path=image_path,
+                    relative_path=relative_path,
+                    result=result,
+                    out_json_path=out_json_path,
+                    out_vis_path=out_vis_path,
+                    manifest=manifest,
+                    config=config,
+                )
+            )
+            # Bounded backlog; `result()` also re-raises writer errors while detection still runs.
+            while len(in_flight) > OUTPUT_WORKERS * OUTPUT_BACKLOG_PER_WORKER:
+                in_flight.popleft().result()
+        for future in in_flight:
+            future.result()
+
+
+def run_visualization(*, config: AppConfig, config_path: Path) -> None:
+    """
+    Draws visualizations from the detection outputs already on disk, without loading a model:
+    the separate pass for detection runs made with `visualization.enabled = false`. Images that
+    have no output are skipped, and existing visualizations are kept unless `output.overwrite`.
+    """
+    project_root = find_project_root(config_path)
 
-    for image_path in iterator:
-        rel = image_path.relative_to(input_dir)
-        out_json_path = map_output_path(
-            output_dir=output_dir,
-            input_dir=input_dir,
-            image_path=image_path,
-            suffix=".json",
-        )
-        out_vis_path = map_output_path(
-            output_dir=vis_dir,
+    input_dir = resolve_from(project_root, config.input.dir)
+    output_dir = resolve_from(project_root, config.output.dir)
+    vis_dir = resolve_from(project_root, config.visualization.dir)
+
+    if not input_dir.exists():
+        raise FileNotFoundError(f"input.dir not found: {input_dir}")
+
+    images = iter_image_files(
+        input_dir=input_dir,
+        recursive=config.input.recursive,
+        extensions=config.input.extensions,
+    )
+    targets = [
+        target
+        for target in _output_targets(
+            images=images,
             input_dir=input_dir,
-            image_path=image_path,
-            suffix=".png",
+            output_dir=output_dir,
+            vis_dir=vis_dir,
+            vis_suffix=f".{config.visualization.format}",
         )
+        if config.output.overwrite or not target[3].exists()
+    ]
+    # In ndjson mode every payload comes from the manifest (a later record for an image wins).
+    manifest: dict[str, dict[str, Any]] | None = None
+    if config.output.mode == "ndjson":
+        manifest = dict(iter_manifest_records(output_dir / NDJSON_MANIFEST_NAME))
+    LOGGER.info("Visualizing up to %d of %d images under %s", len(targets), len(images), input_dir)
 
-        if out_json_path.exists() and not config.output.overwrite:
-            continue
+    try:
+        from tqdm import tqdm  # type: ignore[import-not-found]
+    except ModuleNotFoundError:
+        tqdm = None  # type: ignore[assignment]
 
-        detections = detector.detect(image_path)
-        w, h = get_image_size(image_path)
+    # No GPU work here: decoding, drawing and encoding simply run on the writer pool.
+    with ThreadPoolExecutor(max_workers=OUTPUT_WORKERS, thread_name_prefix="visualize") as pool:
+        results = pool.map(lambda target: _visualize_target(target, manifest, config), targets)
+        if tqdm:
+            results = tqdm(results, total=len(targets), desc="visualize")
+        drawn = sum(results)
+    LOGGER.info("Wrote %d visualizations under %s", drawn, vis_dir)
+
+
+def _visualize_target(
+    target: tuple[Path, str, Path, Path],
+    manifest: dict[str, dict[str, Any]] | None,
+    config: AppConfig,
+) -> bool:
+    image_path, relative_path, json_path, vis_path = target
+    payload = manifest.get(relative_path) if manifest is not None else read_per_image_json(json_path)
+    if payload is None:
+        return False
+    save_visualization(
+        image_path=image_path,
+        detections=detections_from_payload(payload),
+        output_path=vis_path,
+        config=config,
+    )
+    return True
+
+
+def _output_targets(
+    *, images: list[Path], input_dir: Path, output_dir: Path, vis_dir: Path, vis_suffix: str
+) -> Iterator[tuple[Path, str, Path, Path]]:
+    """
+    Yields `(image, relative_path, json output, visualization output)` per image: the same paths
+    `map_output_path` gives, with the `input_dir`-relative part mapped once per subdirectory so
+    only the file name varies per image.
+    """
+    dirs: dict[Path, tuple[str, Path, Path]] = {}
+    for image_path in images:
+        mapped = dirs.get(image_path.parent)
+        if mapped is None:
+            rel_dir = image_path.parent.relative_to(input_dir)
+            prefix = f"{rel_dir.as_posix()}/" if rel_dir.parts else ""
+            mapped = dirs[image_path.parent] = (prefix, output_dir / rel_dir, vis_dir / rel_dir)
+        prefix, json_dir, out_vis_dir = mapped
+        stem = image_path.stem
+        yield (
+            image_path,
+            prefix + image_path.name,
+            json_dir / f"{stem}.json",
+            out_vis_dir / f"{stem}{vis_suffix}",
+        )
 
-        if (not detections) and (not config.output.write_empty):
-            continue
 
+def _write_outputs(
+    *,
+    image_path: Path,
+    relative_path: str,
+    result: ImageDetections,
+    out_json_path: Path,
+    out_vis_path: Path,
+    manifest: NdjsonManifestWriter | None,
+    config: AppConfig,
+) -> None:
+    if (not result.detections) and (not config.output.write_empty):
+        return
+
+    # The detector reports the size of the image it decoded, so the header is not read again.
+    if manifest is not None:
+        manifest.write(
+            build_image_payload(
+                file_name=image_path.name,
+                relative_path=relative_path,
+                width=result.width,
+                height=result.height,
+                detections=result.detections,
+            )
+        )
+    else:
         write_per_image_json(
             output_path=out_json_path,
             file_name=image_path.name,
-            relative_path=str(rel).replace("\\", "/"),
-            width=w,
-            height=h,
-            detections=detections,
+            relative_path=relative_path,
+            width=result.width,
+            height=result.height,
+            detections=result.detections,
         )
 
-        if config.visualization.enabled:
-            save_visualization(
-                image_path=image_path,
-                detections=detections,
-                output_path=out_vis_path,
-                config=config,
-            )
+    # Like the JSON, an existing visualization is kept unless overwriting.
+    if config.visualization.enabled and (config.output.overwrite or not out_vis_path.exists()):
+        save_visualization(
+            image_path=image_path,
+            detections=result.detections,
+            output_path=out_vis_path,
+            config=config,
+            image=result.image,
+        )
@@ -8,6 +8,7 @@ def find_project_root(start: Path) -> Path:
     Walk upwards from `start` to find the project root (directory containing `pyproject.toml`).
     Falls back to `start.parent` if not found.
     """
+    # Resolve and stat `start` once; the fallback below reuses the same answer.
     cursor = start.resolve()
     if cursor.is_file():
         cursor = cursor.parent
@@ -16,14 +17,19 @@ def find_project_root(start: Path) -> Path:
         if (parent / "pyproject.toml").exists():
             return parent
 
-    return start.resolve().parent if start.is_file() else start.resolve()
+    return cursor
 
 
 def resolve_from(base_dir: Path, maybe_relative: Path) -> Path:
     """
     Resolve `maybe_relative` against `base_dir` when it's not absolute.
+
+    An absolute `base_dir` (e.g. from `find_project_root`, already resolved) is joined as is;
+    only a relative one goes through `Path.resolve()` and its per-component symlink lookups.
     """
     if maybe_relative.is_absolute():
         return maybe_relative
+    if base_dir.is_absolute():
+        return base_dir / maybe_relative
     return (base_dir / maybe_relative).resolve()
 
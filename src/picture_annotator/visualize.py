@@ -1,37 +1,111 @@
 from __future__ import annotations
 
+import shutil
+from collections.abc import Callable
+from functools import lru_cache
 from pathlib import Path
+from typing import TYPE_CHECKING, Any, NamedTuple
 
-from picture_annotator.config import AppConfig
+from picture_annotator.config import AppConfig, VisualizationConfig
 from picture_annotator.detectors.base import Detection
 
+if TYPE_CHECKING:
+    import numpy as np
+
+
+class _VisStyle(NamedTuple):
+    font: Any  # PIL.ImageFont.ImageFont | FreeTypeFont
+    color: tuple[int, ...]
+    width: int
+    write_label: bool
+
 
 def save_visualization(
-    *, image_path: Path, detections: list[Detection], output_path: Path, config: AppConfig
+    *,
+    image_path: Path,
+    detections: list[Detection],
+    output_path: Path,
+    config: AppConfig,
+    image: np.ndarray | None = None,
 ) -> None:
+    """
+    Draws `detections` onto the image and saves it to `output_path`. `image` is the BGR frame the
+    detector already decoded (`ImageDetections.image`); when given, the file is not decoded again.
+    """
     try:
-        from PIL import Image, ImageDraw, ImageFont  # type: ignore[import-not-found]
+        from PIL import Image, ImageDraw  # type: ignore[import-not-found]
     except ModuleNotFoundError as e:  # pragma: no cover
         raise RuntimeError(
             "Visualization requires Pillow. Install with `uv sync` (see README)."
         ) from e
 
-    output_path.parent.mkdir(parents=True, exist_ok=True)
+    style = _style(config.visualization)
 
-    with Image.open(image_path) as im:
-        im = im.convert("RGB")
+    if image is not None:
+        source = Image.fromarray(image[:, :, ::-1])  # BGR -> RGB
+    else:
+        source = Image.open(image_path)  # lazy: only the header is read until pixels are needed
+    with source as im:
+        if not detections and im.format == "PNG" and im.mode == "RGB" and _is_png(output_path):
+            # Nothing to draw and the source already is what we would encode: copy the file.
+            im.close()
+            _retry_in_new_dir(output_path, shutil.copyfile, image_path, output_path)
+            return
+        if im.mode != "RGB":
+            im = im.convert("RGB")
         draw = ImageDraw.Draw(im)
-        font = ImageFont.load_default()
-
-        color = tuple(config.visualization.box_color)
-        width = int(config.visualization.line_width)
+        rectangle, text = draw.rectangle, draw.text
+        color, width, font = style.color, style.width, style.font
 
+        # Pillow's rasterizer handles each box in C; boxes and labels stay interleaved per
+        # detection so overlapping labels stack exactly as they always have.
         for det in detections:
-            xmin, ymin, xmax, ymax = det.bbox
-            draw.rectangle([xmin, ymin, xmax, ymax], outline=color, width=width)
-            if config.visualization.write_label:
-                label = f"{det.id}:{det.score:.2f}"
-                draw.text((xmin + 2, ymin + 2), label, fill=color, font=font)
+            rectangle(det.bbox, outline=color, width=width)
+            if style.write_label:
+                xmin, ymin = det.bbox[0], det.bbox[1]
+                text((xmin + 2, ymin + 2), f"{det.id}:{det.score:.2f}", fill=color, font=font)
+
+        if _is_png(output_path):
+            _retry_in_new_dir(output_path, im.save, output_path)
+        else:
+            # Visualizations only need to be viewable: plain baseline JPEG is far cheaper than zlib.
+            _retry_in_new_dir(
+                output_path,
+                im.save,
+                output_path,
+                format="JPEG",
+                quality=config.visualization.jpeg_quality,
+            )
+
+
+def _retry_in_new_dir(
+    output_path: Path, write: Callable[..., Any], *args: Any, **kwargs: Any
+) -> None:
+    """
+    Runs `write(*args, **kwargs)`; if the output directory does not exist yet, creates it and
+    retries once. Only the first image per directory pays for the mkdir.
+    """
+    try:
+        write(*args, **kwargs)
+    except FileNotFoundError:
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        write(*args, **kwargs)
+
+
+def _is_png(path: Path) -> bool:
+    return path.suffix.lower() == ".png"
+
 
-        im.save(output_path)
+@lru_cache(maxsize=4)
+def _style(vis: VisualizationConfig) -> _VisStyle:
+    """
+    Drawing style for a visualization config; built once per config rather than per image.
+    """
+    from PIL import ImageFont  # type: ignore[import-not-found]
 
+    return _VisStyle(
+        font=ImageFont.load_default() if vis.write_label else None,
+        color=tuple(vis.box_color),
+        width=int(vis.line_width),
+        write_label=vis.write_label,
+    )
@@ -4,6 +4,7 @@ from pathlib import Path
 
 import pytest
 
+from picture_annotator import config as config_module
 from picture_annotator.config import load_config
 
 
@@ -36,7 +37,9 @@ enabled = true
     assert cfg.input.dir == Path("data")
     assert cfg.output.dir == Path("out")
     assert cfg.visualization.enabled is False
+    assert cfg.visualization.format == "jpg"
     assert cfg.sahi.enabled is True
+    assert cfg.sahi.batch == 1
 
 
 def test_load_config_invalid_overlap(tmp_path: Path) -> None:
@@ -68,3 +71,43 @@ overlap_width_ratio = 1.2
     with pytest.raises(ValueError):
         load_config(config_path)
 
+
+def test_load_config_cache_invalidated_on_edit(tmp_path: Path) -> None:
+    config_path = tmp_path / "config.toml"
+    config_path.write_text("[model]\nimgsz = 640\n", encoding="utf-8")
+
+    assert load_config(config_path).model.imgsz == 640
+    assert (tmp_path / "config.toml.pickle").exists()
+    assert load_config(config_path).model.imgsz == 640
+
+    config_path.write_text("[model]\nimgsz = 1024\n", encoding="utf-8")
+    assert load_config(config_path).model.imgsz == 1024
+
+
+def test_load_config_without_module_file(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    # Frozen builds have no config.py on disk to stat: the TOML still loads, just uncached.
+    monkeypatch.setattr(config_module, "__file__", str(tmp_path / "missing" / "config.pyc"))
+    config_path = tmp_path / "config.toml"
+    config_path.write_text("[model]\nimgsz = 640\n", encoding="utf-8")
+
+    assert load_config(config_path).model.imgsz == 640
+    assert not (tmp_path / "config.toml.pickle").exists()
+
+    (tmp_path / "config.toml.pickle").write_bytes(b"not a pickle")
+    assert load_config(config_path).model.imgsz == 640
+
+
+def test_load_config_invalid_batch(tmp_path: Path) -> None:
+    config_path = tmp_path / "config.toml"
+    config_path.write_text("[model]\nbatch = 0\n", encoding="utf-8")
+
+    with pytest.raises(ValueError):
+        load_config(config_path)
+
+
+def test_load_config_invalid_export_format(tmp_path: Path) -> None:
+    config_path = tmp_path / "config.toml"
+    config_path.write_text('[model]\nexport_format = "tflite"\n', encoding="utf-8")
+
+    with pytest.raises(ValueError):
+        load_config(config_path)
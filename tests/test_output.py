@@ -3,6 +3,9 @@ from __future__ import annotations
 import json
 from pathlib import Path
 
+import pytest
+
+from picture_annotator import output
 from picture_annotator.detectors.base import Detection
 from picture_annotator.output import write_per_image_json
 
@@ -30,3 +33,48 @@ def test_write_per_image_json(tmp_path: Path) -> None:
     assert payload["detections"][0]["id"] == 0
     assert payload["detections"][0]["bbox"] == [1.0, 2.0, 3.0, 4.0]
 
+
+def test_write_per_image_json_matches_stdlib_layout(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    out_path = tmp_path / "nested" / "x.json"
+    kwargs = dict(
+        output_path=out_path,
+        file_name="图.png",
+        relative_path="a/图.png",
+        width=100,
+        height=200,
+        detections=[Detection(id=0, bbox=(1.5, 2.0, 3.25, 4.0), score=0.875)],
+    )
+    write_per_image_json(**kwargs)
+    written = out_path.read_bytes()
+
+    monkeypatch.setattr(output, "orjson", None)
+    write_per_image_json(**kwargs)
+    assert out_path.read_bytes() == written
+    assert written.endswith(b"}\n")
+
+
+def test_ndjson_manifest_resume(tmp_path: Path) -> None:
+    path = tmp_path / "out" / output.NDJSON_MANIFEST_NAME
+    payload = output.build_image_payload(
+        file_name="a.png",
+        relative_path="sub/a.png",
+        width=10,
+        height=20,
+        detections=[Detection(id=0, bbox=(1.0, 2.0, 3.0, 4.0), score=0.5)],
+    )
+    with output.NdjsonManifestWriter(path, append=False) as writer:
+        writer.write(payload)
+
+    # A truncated last line (interrupted run) is ignored and the next record starts on a new line.
+    with path.open("ab") as f:
+        f.write(b'{"format_version"')
+    with output.NdjsonManifestWriter(path, append=True) as writer:
+        writer.write({**payload, "image": {**payload["image"], "relative_path": "b.png"}})
+
+    lines = path.read_bytes().splitlines()
+    assert len(lines) == 3
+    assert json.loads(lines[0]) == payload
+    assert output.read_manifest_relative_paths(path) == {"sub/a.png", "b.png"}
+    assert output.read_manifest_relative_paths(tmp_path / "missing.ndjson") == set()
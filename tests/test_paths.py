@@ -14,6 +14,20 @@ def test_iter_image_files(tmp_path: Path) -> None:
     assert [p.name for p in images] == ["a.png", "b.jpg"]
 
 
+def test_iter_image_files_recursive(tmp_path: Path) -> None:
+    (tmp_path / "sub" / "deep").mkdir(parents=True)
+    (tmp_path / "dir.png").mkdir()
+    (tmp_path / "A.PNG").write_bytes(b"x")
+    (tmp_path / "sub" / "b.jpg").write_bytes(b"x")
+    (tmp_path / "sub" / "deep" / "c.png").write_bytes(b"x")
+    (tmp_path / "dir.png" / "d.png").write_bytes(b"x")
+    (tmp_path / "sub" / "e.txt").write_text("x", encoding="utf-8")
+
+    images = iter_image_files(input_dir=tmp_path, recursive=True, extensions=(".png", ".jpg"))
+    rels = [p.relative_to(tmp_path).as_posix() for p in images]
+    assert rels == ["A.PNG", "dir.png/d.png", "sub/b.jpg", "sub/deep/c.png"]
+
+
 def test_map_output_path(tmp_path: Path) -> None:
     input_dir = tmp_path / "in"
     output_dir = tmp_path / "out"
@@ -24,3 +38,13 @@ def test_map_output_path(tmp_path: Path) -> None:
     out = map_output_path(output_dir=output_dir, input_dir=input_dir, image_path=image_path, suffix=".json")
     assert out == output_dir / "sub" / "x.json"
 
+
+
+def test_iter_image_files_missing_dir(tmp_path: Path) -> None:
+    (tmp_path / "file.png").write_bytes(b"x")
+
+    for input_dir in (tmp_path / "missing", tmp_path / "file.png"):
+        for recursive in (False, True):
+            assert iter_image_files(
+                input_dir=input_dir, recursive=recursive, extensions=(".png",)
+            ) == []
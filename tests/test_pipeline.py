@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from picture_annotator.config import (
+    AppConfig,
+    InputConfig,
+    ModelConfig,
+    OutputConfig,
+    SahiConfig,
+    VisualizationConfig,
+)
+from picture_annotator.detectors.base import Detection
+from picture_annotator.output import write_per_image_json
+from picture_annotator.paths import map_output_path
+from picture_annotator.pipeline import _output_targets, run_visualization
+
+
+def test_output_targets_match_map_output_path(tmp_path: Path) -> None:
+    input_dir = tmp_path / "in"
+    output_dir = tmp_path / "out"
+    vis_dir = tmp_path / "vis"
+    images = [input_dir / "a.png", input_dir / "sub" / "b.c.JPG", input_dir / "sub" / "deep" / "d.png"]
+
+    targets = list(
+        _output_targets(
+            images=images,
+            input_dir=input_dir,
+            output_dir=output_dir,
+            vis_dir=vis_dir,
+            vis_suffix=".jpg",
+        )
+    )
+
+    assert [t[1] for t in targets] == ["a.png", "sub/b.c.JPG", "sub/deep/d.png"]
+    for image_path, _, json_path, vis_path in targets:
+        assert json_path == map_output_path(
+            output_dir=output_dir, input_dir=input_dir, image_path=image_path, suffix=".json"
+        )
+        assert vis_path == map_output_path(
+            output_dir=vis_dir, input_dir=input_dir, image_path=image_path, suffix=".jpg"
+        )
+
+
+def test_run_visualization_draws_existing_outputs(tmp_path: Path) -> None:
+    from PIL import Image
+
+    (tmp_path / "pyproject.toml").write_text("", encoding="utf-8")
+    (tmp_path / "in").mkdir()
+    for name in ("a.png", "b.png"):
+        Image.new("RGB", (32, 24)).save(tmp_path / "in" / name)
+    write_per_image_json(
+        output_path=tmp_path / "out" / "a.json",
+        file_name="a.png",
+        relative_path="a.png",
+        width=32,
+        height=24,
+        detections=[Detection(id=0, bbox=(1.0, 2.0, 10.0, 12.0), score=0.5)],
+    )
+    config = AppConfig(
+        input=InputConfig(dir=Path("in")),
+        output=OutputConfig(dir=Path("out")),
+        visualization=VisualizationConfig(enabled=False, dir=Path("vis")),
+        model=ModelConfig(),
+        sahi=SahiConfig(),
+    )
+
+    run_visualization(config=config, config_path=tmp_path / "config.toml")
+
+    assert sorted(p.name for p in (tmp_path / "vis").iterdir()) == ["a.jpg"]
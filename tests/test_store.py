@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import json
+import math
+from pathlib import Path
+
+from PIL import Image
+
+from picture_annotator.config import (
+    AppConfig,
+    InputConfig,
+    ModelConfig,
+    OutputConfig,
+    SahiConfig,
+    VisualizationConfig,
+)
+from picture_annotator.gui.store import AnnotationStore
+
+
+def _store_with_json(tmp_path: Path, json_text: str) -> AnnotationStore:
+    (tmp_path / "in").mkdir()
+    (tmp_path / "out").mkdir()
+    Image.new("RGB", (100, 80)).save(tmp_path / "in" / "a.png")
+    (tmp_path / "out" / "a.json").write_text(json_text, encoding="utf-8")
+    config = AppConfig(
+        input=InputConfig(dir=Path("in")),
+        output=OutputConfig(dir=Path("out")),
+        visualization=VisualizationConfig(),
+        model=ModelConfig(),
+        sahi=SahiConfig(),
+    )
+    return AnnotationStore(app_root=tmp_path, config=config)
+
+
+def test_load_reports_dropped_ids_in_file_order(tmp_path: Path) -> None:
+    detections = [
+        {"id": 0, "bbox": [1, 1, 5, 5], "score": 0.9},
+        {"id": 1, "bbox": [5, 5, 1, 1], "score": 0.9},  # degenerate: dropped by the array pass
+        {"id": 2, "bbox": [1, 1, 5], "score": 0.9},  # wrong shape: dropped per item
+        {"id": 3, "bbox": [2, 2, 300, 3], "score": 1},  # clamped to the image
+    ]
+    payload = {"image": {"width": 100, "height": 80}, "detections": detections}
+    store = _store_with_json(tmp_path, json.dumps(payload))
+
+    session, report = store.load(store.list_images()[0])
+
+    assert report.dropped_invalid == [1, 2]
+    assert report.clamped_count == 1
+    assert [(d.id, d.xmax) for d in session.detections] == [(0, 5.0), (3, 100.0)]
+
+
+def test_load_rejects_numeric_strings(tmp_path: Path) -> None:
+    detections = [
+        {"id": 0, "bbox": ["1", 1, 5, 5], "score": 0.9},
+        {"id": 1, "bbox": [1, 1, 5, 5], "score": "0.9"},
+        {"id": 2, "bbox": [1, 1, 5, 5], "score": 1},
+    ]
+    payload = {"image": {"width": 100, "height": 80}, "detections": detections}
+    store = _store_with_json(tmp_path, json.dumps(payload))
+
+    session, report = store.load(store.list_images()[0])
+
+    assert report.dropped_invalid == [0, 1]
+    assert [(d.id, d.score) for d in session.detections] == [(2, 1.0)]
+
+
+def test_load_and_save_keep_nan_scores(tmp_path: Path) -> None:
+    # Older outputs were written by `json.dump`, which emits NaN; orjson alone rejects it.
+    payload = {
+        "image": {"width": 100, "height": 80},
+        "detections": [{"id": 0, "bbox": [1.0, 2.0, 5.0, 6.0], "score": math.nan}],
+    }
+    store = _store_with_json(tmp_path, json.dumps(payload))
+    entry = store.list_images()[0]
+
+    session, report = store.load(entry)
+    assert not report.json_parse_failed
+    assert [d.id for d in session.detections] == [0]
+    assert math.isnan(session.detections[0].score)
+
+    session.dirty = True
+    store.save(session)
+    assert "NaN" in entry.json_path.read_text(encoding="utf-8")
+    reloaded, _ = AnnotationStore(app_root=tmp_path, config=store.config).load(entry)
+    assert [d.id for d in reloaded.detections] == [0]